@@ -0,0 +1,110 @@
+"""
+Benchmark: reconstruction des agrégats de progression (load_aggregates,
+quand le fichier .stats.json est périmé), tour par tour en Python pur
+(ProgressAggregates.from_turns, sans NumPy) vs vue colonnaire NumPy
+(build_aggregates), puis tableau de bord de ProgressTracker sur le résultat.
+
+Usage:
+    python benchmarks/bench_analytics.py [nombre_de_tours]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.aggregates import ProgressAggregates, build_aggregates
+from modules.analytics import ProgressTracker
+
+
+WORDS = (
+    "I you we they go went school work yesterday tomorrow happy because the a "
+    "meeting travel airport hotel want to practice English every day really"
+).split()
+CORRECTIONS = [
+    "None - well done!",
+    'You said "I go school" - it should be "I go TO school"',
+    'You said "we was" - it should be "we were"',
+    'You said "I want practice" - it should be "I want TO practice"',
+    'You said "more better" - it should be "better"',
+]
+VOCABULARY = [f'"word{i}" (definition {i})' for i in range(2000)]
+TIPS = [f"Grammar tip number {i}" for i in range(300)]
+
+
+def synthetic_turns(count, seed=42):
+    """
+    Génère des tours au même format que ConversationManager.add_turn.
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    turns = []
+    for i in range(count):
+        timestamp = start + timedelta(minutes=3 * i)
+        turns.append({
+            "timestamp": timestamp.isoformat(),
+            "user": " ".join(rng.choices(WORDS, k=rng.randint(1, 25))),
+            "ai_full_response": "",
+            "ai_response": " ".join(rng.choices(WORDS, k=rng.randint(10, 40))),
+            "corrections": rng.sample(CORRECTIONS, rng.randint(1, 2)),
+            "vocabulary": rng.sample(VOCABULARY, 2),
+            "grammar_tips": [rng.choice(TIPS)],
+        })
+    return turns
+
+
+def dashboard(source):
+    """
+    Reproduit les appels de la page Progress + get_report.
+    """
+    return (
+        source.get_total_turns(),
+        source.get_total_words_spoken(),
+        source.get_average_words_per_turn(),
+        source.get_correction_free_turns(),
+        sorted(source.get_daily_progress().items()),
+        source.get_recurring_errors(top_n=5),
+        sorted(source.get_grammar_tips()),
+        sorted(source.get_vocabulary_learned()),
+        source.get_report(),
+    )
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<32} {elapsed * 1000:10.1f} ms")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"📊 Generating {count} synthetic turns...")
+    turns = synthetic_turns(count)
+
+    # Tracker sur un fichier vide: on injecte directement les agrégats
+    temp_dir = tempfile.mkdtemp()
+    tracker = ProgressTracker(conversations_file=os.path.join(temp_dir, "bench.jsonl"))
+
+    print("\nPython (tour par tour):")
+    reference = timed("rebuild aggregates", lambda: ProgressAggregates.from_turns(turns))
+    tracker.stats = reference
+    expected = timed("dashboard", lambda: dashboard(tracker))
+
+    print("\nNumPy (vue colonnaire):")
+    aggregates = timed("rebuild aggregates", lambda: build_aggregates(turns))
+    tracker.stats = aggregates
+    result = timed("dashboard", lambda: dashboard(tracker))
+
+    if result != expected or aggregates.to_dict() != reference.to_dict():
+        print("\n❌ Results differ between implementations!")
+        sys.exit(1)
+    print("\n✅ Identical results")
+
+
+if __name__ == "__main__":
+    main()
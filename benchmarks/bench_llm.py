@@ -0,0 +1,180 @@
+"""
+Benchmark: débit et latence de queue du client LLM partagé (LLMService),
+contre le serveur de substitution hors ligne (benchmarks/llm_standin.py).
+
+Mélange de classes: moitié de tours live (en flux), un quart de traductions,
+un quart de requêtes batch.
+
+Vérifie d'abord (sans serveur) que le disjoncteur et les requêtes hedgées
+se rétablissent après un essai sans verdict ou un appel annulé.
+
+Usage:
+    python benchmarks/bench_llm.py [requêtes] [concurrence] [taux_erreur] [requêtes_par_minute]
+"""
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.llm_standin import StandinServer, StandinSettings
+from modules.llm_client import get_system_prompt
+from modules.llm_service import LLMService
+from modules.resilience import LLMError, CircuitBreaker
+from modules.scheduler import RequestScheduler
+
+# Classe de priorité de la requête i (les tours live sont en flux)
+PRIORITY_MIX = ("live", "translation", "live", "batch")
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def one_turn(service, i, priority):
+    """
+    Un tour d'élève: (latence totale, délai du premier morceau, erreur).
+    """
+    messages = [
+        {"role": "system", "content": get_system_prompt()},
+        {"role": "user", "content": f"Yesterday I go to the school number {i} with my friends"},
+    ]
+    start = time.monotonic()
+    first = None
+    try:
+        if priority == "live":
+            async for _ in service.chat_stream(messages, max_tokens=300, priority=priority):
+                if first is None:
+                    first = time.monotonic() - start
+        else:
+            await service.chat(messages, max_tokens=300, priority=priority)
+            first = time.monotonic() - start
+        return time.monotonic() - start, first, None
+    except LLMError as e:
+        return time.monotonic() - start, first, e.kind
+
+
+async def load(service, count):
+    return await asyncio.gather(*(
+        one_turn(service, i, PRIORITY_MIX[i % len(PRIORITY_MIX)]) for i in range(count)
+    ))
+
+
+class ScriptedClient:
+    """
+    Faux client: chaque appel exécute l'action suivante du script
+    ("ok", "slow" ou une LLMError à lever).
+    """
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, **kwargs):
+        action = self.script.pop(0) if self.script else "ok"
+        if isinstance(action, LLMError):
+            raise action
+        if action == "slow":
+            await asyncio.sleep(10)
+        message = SimpleNamespace(content="ok")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+async def breaker_scenario(service, trial_action, hedge=False):
+    """
+    Disjoncteur en demi-ouverture, essai terminé par `trial_action`:
+    l'appel suivant doit être tenté et aucune place ne doit rester prise.
+    """
+    service.client = ScriptedClient(trial_action, "ok")
+    service.breaker = CircuitBreaker(threshold=1, cooldown=0)
+    service.breaker.record_failure()
+    try:
+        await asyncio.wait_for(service.chat([{"role": "user", "content": "hi"}], hedge=hedge), 0.2)
+    except (LLMError, asyncio.TimeoutError):
+        pass
+    leaked = service.scheduler.in_flight
+    try:
+        await service.chat([{"role": "user", "content": "hi"}], hedge=False)
+        recovered = True
+    except LLMError:
+        recovered = False
+    return recovered, leaked
+
+
+def check_recovery():
+    """
+    Vérifications de non-régression (sans réseau): True si tout passe.
+    """
+    service = LLMService(api_key="local", client=ScriptedClient(),
+                         scheduler=RequestScheduler(4, None, None, queue_limits={}))
+    for _ in range(service.latency.min_samples):
+        service.latency.record(0.5)  # hedging au bout de 500 ms: après l'annulation à 200 ms
+    cases = {
+        "trial rejected (bad_request)": (LLMError("bad_request", "rejected"), False),
+        "trial refused (overloaded)": (LLMError("overloaded", "queue full"), False),
+        "trial cancelled by the caller": ("slow", False),
+        "hedged trial cancelled": ("slow", True),
+    }
+    passed = True
+    for name, (action, hedge) in cases.items():
+        recovered, leaked = service.submit(breaker_scenario(service, action, hedge)).result()
+        ok = recovered and leaked == 0
+        passed = passed and ok
+        print(f"  {'✅' if ok else '❌'} {name}: next call {'served' if recovered else 'circuit_open'}, "
+              f"{leaked} slot(s) left in flight")
+    return passed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    error_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.02
+    requests_per_minute = int(sys.argv[4]) if len(sys.argv) > 4 else None
+
+    print("🔌 Breaker and hedging recovery")
+    if not check_recovery():
+        sys.exit(1)
+
+    settings = StandinSettings(ttft_median=0.2, ttft_sigma=0.6, tokens_per_second=300,
+                               error_rate=error_rate, seed=1)
+    server = StandinServer(settings, port=0).start()
+    service = LLMService(api_key="local", backend="local", base_url=server.base_url,
+                         max_concurrency=concurrency, max_connections=concurrency,
+                         scheduler=RequestScheduler(concurrency, requests_per_minute, None,
+                                                    queue_limits={}))
+
+    print(f"🤖 {count} requests, concurrency {concurrency}, {error_rate:.0%} injected errors, "
+          f"{requests_per_minute or 'unlimited'} requests/min")
+    start = time.perf_counter()
+    results = service.submit(load(service, count)).result()
+    elapsed = time.perf_counter() - start
+    server.stop()
+
+    ok = [r for r in results if r[2] is None]
+    latencies = [r[0] for r in ok]
+    first_chunks = [r[1] for r in ok if r[1] is not None]
+    errors = {}
+    for _, _, kind in results:
+        if kind:
+            errors[kind] = errors.get(kind, 0) + 1
+
+    print(f"  Throughput:      {len(ok) / elapsed:8.1f} req/s  ({len(ok)}/{count} ok in {elapsed:.2f}s)")
+    print(f"  Latency p50/p95/p99: {percentile(latencies, 0.5) * 1000:6.0f} / "
+          f"{percentile(latencies, 0.95) * 1000:6.0f} / {percentile(latencies, 0.99) * 1000:6.0f} ms")
+    print(f"  First chunk p50/p95: {percentile(first_chunks, 0.5) * 1000:6.0f} / "
+          f"{percentile(first_chunks, 0.95) * 1000:6.0f} ms")
+    print(f"  Server requests: {server.requests} (retries + hedges included)")
+    print(f"  Errors:          {errors or 'none'}")
+    metrics = service.scheduler.metrics()
+    for name in metrics["admitted"]:
+        print(f"  [{name:<11}] admitted {metrics['admitted'][name]:4}  "
+              f"max queued {metrics['max_queued'][name]:4}  avg wait {metrics['avg_wait'][name] * 1000:7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
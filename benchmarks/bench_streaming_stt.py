@@ -0,0 +1,51 @@
+"""
+Benchmark: délai entre la fin de la parole et le texte, transcription de
+tout l'énoncé à la fin vs transcription incrémentale (modules/streaming_stt.py).
+L'audio est lu en temps réel par le micro de substitution (fichier WAV).
+Nécessite whisper (modèle STT_MODEL_SIZE).
+
+Usage:
+    python benchmarks/bench_streaming_stt.py [fichier.wav]
+"""
+import os
+import sys
+import time
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import STT_LANGUAGE, STT_MODEL_SIZE
+from modules.audio_input import WavInputStream
+from modules.streaming_stt import transcribe_streaming
+from modules.stt_registry import get_stt_model
+from modules.vad import record_utterance
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    fixture = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "temp_audio.wav")
+    microphone = partial(WavInputStream, fixture, realtime=True)
+
+    model = get_stt_model()
+    print(f"📥 Warming up Whisper '{STT_MODEL_SIZE}'...")
+    model.warm_up(background=False)
+
+    # Énoncé complet décodé après la fin de la parole
+    audio = record_utterance(5, open_stream=microphone)
+    start = time.monotonic()
+    batch_text = model.transcribe(audio, language=STT_LANGUAGE)["text"].strip()
+    batch_latency = time.monotonic() - start
+
+    # Décodage pendant la parole, seule la fin reste à décoder
+    stream_text, stream_latency = transcribe_streaming(
+        lambda on_audio: record_utterance(5, open_stream=microphone, on_audio=on_audio),
+        model=model,
+    )
+
+    print(f"  Batch:     {batch_latency * 1000:7.0f} ms after end of speech  \"{batch_text}\"")
+    print(f"  Streaming: {stream_latency * 1000:7.0f} ms after end of speech  \"{stream_text}\"")
+
+
+if __name__ == "__main__":
+    main()
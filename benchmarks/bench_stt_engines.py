@@ -0,0 +1,136 @@
+"""
+Benchmark: moteurs de reconnaissance vocale (modules/stt_engines.py) sur
+les fichiers audio fournis (temp_audio.wav par défaut).
+
+Pour chaque moteur installé, dans un processus séparé (mémoire mesurée
+sans l'autre moteur): temps de chargement, facteur temps réel (durée du
+décodage / durée de l'audio, < 1 = plus rapide que le temps réel), pic de
+mémoire résidente (RSS). Les transcriptions sont comparées à celles du
+premier moteur (accord = 1 - taux d'erreur sur les mots).
+
+Usage:
+    python benchmarks/bench_stt_engines.py [fichier.wav ...] [--size base] [--runs 3]
+                                           [--engines whisper,faster-whisper]
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import STT_LANGUAGE, STT_MODEL_SIZE, STT_SAMPLE_RATE, STT_THREADS
+from modules.stt_engines import ENGINES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def peak_rss_mb():
+    """
+    Pic de mémoire résidente du processus en Mo (None hors Unix).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: kilo-octets, macOS: octets
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def words(text):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """
+    Distance d'édition sur les mots / nombre de mots de la référence.
+    """
+    reference, hypothesis = words(reference), words(hypothesis)
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref in enumerate(reference, 1):
+        current = [i]
+        for j, hyp in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref != hyp)))
+        previous = current
+    return previous[-1] / len(reference)
+
+
+def run_engine(engine, size, fixtures, runs):
+    """
+    Mesures d'un moteur (exécuté dans le processus fils).
+    """
+    from modules.audio_input import load_audio
+
+    audio = [load_audio(path) for path in fixtures]
+    start = time.perf_counter()
+    model = ENGINES[engine](size, STT_THREADS)
+    load_seconds = time.perf_counter() - start
+    # Premier décodage à part (initialisation des noyaux), comme le chauffage de l'application
+    model.transcribe(audio[0], language=STT_LANGUAGE)
+
+    results = []
+    for path, samples in zip(fixtures, audio):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            text = model.transcribe(samples, language=STT_LANGUAGE)["text"].strip()
+            timings.append(time.perf_counter() - start)
+        duration = len(samples) / STT_SAMPLE_RATE
+        results.append({"fixture": path, "duration": duration, "rtf": min(timings) / duration, "text": text})
+    return {"engine": engine, "load_seconds": load_seconds, "peak_rss_mb": peak_rss_mb(), "fixtures": results}
+
+
+def measure(engine, size, fixtures, runs):
+    """
+    Lance le moteur dans un processus séparé; None s'il n'est pas disponible.
+    """
+    command = [sys.executable, os.path.abspath(__file__), "--worker", engine,
+               "--size", size, "--runs", str(runs), *fixtures]
+    process = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+    if process.returncode != 0:
+        error = (process.stderr.strip().splitlines() or ["unknown error"])[-1]
+        print(f"⚠️ {engine}: skipped ({error})")
+        return None
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare STT engines on audio fixtures")
+    parser.add_argument("fixtures", nargs="*", default=[os.path.join(ROOT, "temp_audio.wav")])
+    parser.add_argument("--size", default=STT_MODEL_SIZE)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--engines", default=",".join(ENGINES))
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    fixtures = [os.path.abspath(path) for path in args.fixtures]
+
+    if args.worker:
+        print(json.dumps(run_engine(args.worker, args.size, fixtures, args.runs)))
+        return
+
+    print(f"🎤 Model '{args.size}', {len(fixtures)} fixture(s), best of {args.runs} runs")
+    reports = [report for report in (measure(engine, args.size, fixtures, args.runs)
+                                     for engine in args.engines.split(",")) if report]
+    if not reports:
+        print("❌ No STT engine installed (pip install openai-whisper faster-whisper)")
+        return
+
+    reference = reports[0]
+    for report in reports:
+        rss = f"{report['peak_rss_mb']:.0f} MB" if report["peak_rss_mb"] is not None else "n/a"
+        print(f"\n  [{report['engine']}] load {report['load_seconds']:.1f}s  peak RSS {rss}")
+        for result, expected in zip(report["fixtures"], reference["fixtures"]):
+            agreement = 1 - word_error_rate(expected["text"], result["text"])
+            print(f"    {os.path.basename(result['fixture']):<20} RTF {result['rtf']:.3f}  "
+                  f"agreement with {reference['engine']} {agreement:.0%}")
+            print(f"      {result['text']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Vérification du démarrage à froid: profil des imports de l'application et
+temps de rendu des pages Settings, Vocab et Progress dans un processus neuf.
+Échoue (code 1) si une page dépasse la cible ou si une dépendance lourde
+(whisper, torch, micro, edge-tts, SDK Groq...) est importée au démarrage.
+
+Usage:
+    python benchmarks/check_cold_start.py [cible_en_secondes]
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pages qui ne doivent rien charger de lourd
+PAGES = ("Settings", "Vocab", "Progress")
+
+# Modules qui ne doivent être importés qu'au premier usage
+HEAVY_MODULES = (
+    "whisper", "torch", "sounddevice", "soundfile", "edge_tts",
+    "groq", "httpx", "streamlit_lottie", "requests",
+)
+
+# Modules importés par streamlit_app.py (hors Streamlit)
+APP_MODULES = (
+    "modules.llm_client", "modules.context", "modules.resilience", "modules.feedback",
+    "modules.speech_pipeline", "modules.conversation", "modules.analytics",
+    "modules.maintenance", "modules.timerange", "modules.stt", "modules.translator",
+    "modules.tts", "config",
+)
+
+DEFAULT_TARGET = 3.0  # secondes par page (import de Streamlit compris)
+
+PAGE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("streamlit_app.py", default_timeout=60)
+app.run()
+app.sidebar.radio[0].set_value({page!r}).run()
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "errors": [str(e.value) for e in app.exception],
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "errors": [],
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_fresh(code, *args):
+    """
+    Exécute du code dans un interpréteur neuf (depuis la racine du dépôt).
+    Le chauffage du modèle Whisper est désactivé: il tourne en arrière-plan,
+    hors du rendu des pages, et importerait whisper pendant la mesure.
+    """
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "STT_WARM_UP": "0"},
+    )
+
+
+def import_profile(top=15):
+    """
+    Modules les plus coûteux à importer (python -X importtime), cumul en ms.
+    """
+    code = "\n".join(f"import {name}" for name in APP_MODULES)
+    result = run_fresh(code, "-X", "importtime")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def streamlit_available():
+    return run_fresh("import streamlit.testing.v1").returncode == 0
+
+
+def main():
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TARGET
+
+    print("⏱️  Import profile of the app modules (cumulative ms):")
+    for ms, name in import_profile():
+        print(f"   {ms:8.1f}  {name}")
+
+    if streamlit_available():
+        checks = [(page, PAGE_SCRIPT.format(page=page, heavy=HEAVY_MODULES)) for page in PAGES]
+    else:
+        print("⚠️  Streamlit not installed: timing the app imports only")
+        checks = [("app imports", IMPORT_SCRIPT.format(modules=APP_MODULES, heavy=HEAVY_MODULES))]
+
+    failed = False
+    for name, code in checks:
+        result = run_fresh(code)
+        if result.returncode != 0:
+            print(f"❌ {name}: {result.stderr.strip().splitlines()[-1] if result.stderr else 'failed'}")
+            failed = True
+            continue
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        problems = []
+        if report["seconds"] > target:
+            problems.append(f"over the {target:.1f}s target")
+        if report["heavy"]:
+            problems.append(f"imported {', '.join(report['heavy'])}")
+        if report["errors"]:
+            problems.append(f"errors: {report['errors']}")
+        status = "❌" if problems else "✅"
+        print(f"{status} {name}: {report['seconds']:.2f}s {'; '.join(problems)}")
+        failed = failed or bool(problems)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
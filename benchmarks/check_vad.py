@@ -0,0 +1,101 @@
+"""
+Vérification de la détection de fin de parole (modules/vad.py) avec le micro
+de substitution (WAV) : début/fin détectés, durée capturée et délai
+d'arrêt comparés à l'ancien enregistrement fixe de 10 s.
+
+Usage:
+    python benchmarks/check_vad.py [fichier.wav]
+"""
+import os
+import sys
+import tempfile
+import time
+import wave
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from config import STT_SAMPLE_RATE, STT_FRAME_MS, STT_MAX_UTTERANCE
+from modules.audio_input import WavInputStream
+from modules.vad import Endpointer, record_utterance
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXED_RECORDING = 10  # secondes (ancien listen_once)
+
+
+def write_wav(path, samples, rate=STT_SAMPLE_RATE):
+    data = (np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes()
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(data)
+
+
+def synthetic(segments, seed=0):
+    """
+    Audio de test: [(secondes, "silence" | "speech")], la « parole » étant
+    un bruit modulé bien au-dessus du seuil.
+    """
+    rng = np.random.default_rng(seed)
+    parts = []
+    for seconds, kind in segments:
+        n = int(seconds * STT_SAMPLE_RATE)
+        noise = rng.normal(0, 0.001, n)
+        if kind == "speech":
+            t = np.arange(n) / STT_SAMPLE_RATE
+            noise += 0.2 * np.sin(2 * np.pi * 220 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+        parts.append(noise)
+    return np.concatenate(parts).astype(np.float32)
+
+
+def run(path, realtime=False, timeout=2.0):
+    endpointer = Endpointer()
+    stream = partial(WavInputStream, path, realtime=realtime)
+    start = time.monotonic()
+    audio = record_utterance(timeout, endpointer, open_stream=stream)
+    return audio, endpointer, time.monotonic() - start
+
+
+def main():
+    frame = STT_FRAME_MS / 1000
+    directory = tempfile.mkdtemp()
+    cases = [
+        ("short answer", synthetic([(1.0, "silence"), (0.6, "speech"), (2.0, "silence")]), True),
+        ("pause inside", synthetic([(0.5, "silence"), (0.8, "speech"), (0.4, "silence"),
+                                    (0.8, "speech"), (2.0, "silence")]), True),
+        ("click only", synthetic([(0.5, "silence"), (0.03, "speech"), (1.0, "silence")]), False),
+        ("silence only", synthetic([(1.5, "silence")]), False),
+        ("monologue", synthetic([(0.2, "silence"), (STT_MAX_UTTERANCE + 5, "speech")]), True),
+    ]
+    failed = False
+    for name, samples, expect_speech in cases:
+        path = os.path.join(directory, name.replace(" ", "_") + ".wav")
+        write_wav(path, samples)
+        audio, endpointer, _ = run(path)
+        detected = audio is not None
+        ok = detected == expect_speech
+        if detected:
+            print(f"{'✅' if ok else '❌'} {name:<13} start {endpointer.speech_start * frame:5.2f}s  "
+                  f"stop {endpointer.frames_seen * frame:5.2f}s  captured {len(audio) / STT_SAMPLE_RATE:5.2f}s  "
+                  f"({endpointer.reason})")
+        else:
+            print(f"{'✅' if ok else '❌'} {name:<13} no utterance")
+        failed = failed or not ok
+
+    fixture = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "temp_audio.wav")
+    if os.path.exists(fixture):
+        audio, endpointer, elapsed = run(fixture, realtime=True, timeout=5)
+        if audio is None:
+            print(f"❌ {os.path.basename(fixture)}: no speech detected")
+            failed = True
+        else:
+            print(f"🎤 {os.path.basename(fixture)} (real time): stopped after {elapsed:.2f}s "
+                  f"instead of {FIXED_RECORDING}s, captured {len(audio) / STT_SAMPLE_RATE:.2f}s")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Serveur LLM de substitution hors ligne, compatible OpenAI (chat completions).
+Répond au format du tuteur (Corrections / Vocabulary / Grammar Tip), du
+traducteur et des résumés, avec une latence, un débit de tokens et des
+erreurs configurables: de quoi mesurer débit et latence de queue sans
+service réel (voir benchmarks/bench_llm.py).
+
+Usage:
+    python benchmarks/llm_standin.py [--port 8765] [--ttft-median 0.3] [--tokens-per-second 150]
+                                     [--error-rate 0.02] [--hang-rate 0.0]
+    LLM_BACKEND=local python main.py
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+
+
+# Statuts renvoyés pour les erreurs injectées (tirés au hasard)
+ERROR_STATUSES = (429, 500, 503)
+
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+class StandinSettings:
+    """
+    Paramètres de simulation.
+    - ttft_median / ttft_sigma: délai avant le premier token (loi log-normale)
+    - tokens_per_second: débit de génération (0 = instantané)
+    - error_rate: probabilité d'une erreur HTTP (429/500/503)
+    - hang_rate: probabilité de ne jamais répondre (teste les timeouts du client)
+    """
+
+    def __init__(self, ttft_median=0.3, ttft_sigma=0.5, tokens_per_second=150.0,
+                 error_rate=0.0, hang_rate=0.0, seed=None):
+        self.ttft_median = ttft_median
+        self.ttft_sigma = ttft_sigma
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.rng = random.Random(seed)
+
+    def time_to_first_token(self):
+        if self.ttft_median <= 0:
+            return 0.0
+        return self.rng.lognormvariate(math.log(self.ttft_median), self.ttft_sigma)
+
+    def token_delay(self):
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+
+# =========================
+# Réponses simulées
+# =========================
+
+CORRECTIONS = [
+    "None - well done!",
+    'You said "I want practice" - it should be "I want TO practice"',
+    'You said "I go school" - it should be "I go TO school"',
+]
+VOCABULARY = [
+    '"schedule" (a plan of times for events)', '"improve" (to get better)',
+    '"journey" (a trip from one place to another)', '"colleague" (a person you work with)',
+    '"delicious" (very tasty)', '"appointment" (a planned meeting)',
+]
+GRAMMAR_TIPS = [
+    "Use the past simple for finished actions: I went, I saw, I ate.",
+    "want/need/like + TO + verb (infinitive)",
+    "Use 'a' before consonant sounds and 'an' before vowel sounds.",
+    "Third person singular takes -s in the present simple: she works.",
+]
+
+
+def _last_user_message(messages):
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return message.get("content", "")
+    return ""
+
+
+def tutor_reply(messages, rng):
+    """
+    Réponse au format attendu par l'appelant (deviné depuis le prompt).
+    """
+    prompt = _last_user_message(messages)
+
+    if "Words to translate:" in prompt:
+        listing = prompt.split("Words to translate:", 1)[1].split("Format your response", 1)[0]
+        items = re.findall(r"^(\d+)\. (.+)$", listing, re.MULTILINE)
+        return "\n\n".join(
+            f"{number}. {word}\n**Translation:** {word} (translated)\n**Example:** Here is {word} in a sentence."
+            for number, word in items
+        )
+    if "**Translation:**" in prompt:
+        word = re.search(r'Word to translate: "(.*)"', prompt)
+        word = word.group(1) if word else "word"
+        return f"**Translation:** {word} (translated)\n**Example:** Here is {word} in a sentence."
+    if prompt.startswith("Summarize this"):
+        return ("The student practised everyday English with the tutor. "
+                "They talked about their daily routine and hobbies. "
+                "They sometimes forget 'to' after 'want'.")
+
+    words = prompt.split()
+    topic = " ".join(words[:6]) if words else "that"
+    return (
+        f"That's interesting! You said: {topic}. Can you tell me more about it?\n\n"
+        "---\n"
+        f"**Corrections:** {rng.choice(CORRECTIONS)}\n"
+        f"**Vocabulary:** {', '.join(rng.sample(VOCABULARY, 2))}\n"
+        f"**Grammar Tip:** {rng.choice(GRAMMAR_TIPS)}"
+    )
+
+
+def tokenize(text, max_tokens=None):
+    """
+    Découpe en tokens simulés (un mot + espaces); tronque à max_tokens.
+    """
+    tokens = _TOKEN.findall(text)
+    if max_tokens is not None and len(tokens) > max_tokens:
+        return tokens[:max_tokens], "length"
+    return tokens, "stop"
+
+
+# =========================
+# Serveur HTTP/1.1 minimal (keep-alive, chunked)
+# =========================
+
+class StandinServer:
+    """
+    Serveur asyncio: POST /v1/chat/completions (et /openai/v1/... pour le
+    SDK Groq), GET /health. Les connexions sont gardées ouvertes (keep-alive).
+    """
+
+    def __init__(self, settings=None, host="127.0.0.1", port=8765):
+        self.settings = settings or StandinSettings()
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+                await self._route(method, path, body, writer)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send(self, writer, status, payload, reason="OK"):
+        data = json.dumps(payload).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n".encode('latin-1') + data
+        )
+        await writer.drain()
+
+    async def _route(self, method, path, body, writer):
+        if method == "GET" and path == "/health":
+            await self._send(writer, 200, {"status": "ok", "requests": self.requests})
+            return
+        if method != "POST" or not path.endswith("/chat/completions"):
+            await self._send(writer, 404, {"error": {"message": f"Unknown route {path}"}}, "Not Found")
+            return
+
+        self.requests += 1
+        settings = self.settings
+        request = json.loads(body or b"{}")
+        draw = settings.rng.random()
+        if draw < settings.hang_rate:
+            await asyncio.sleep(3600)
+            return
+        await asyncio.sleep(settings.time_to_first_token())
+        if draw < settings.hang_rate + settings.error_rate:
+            status = settings.rng.choice(ERROR_STATUSES)
+            await self._send(writer, status, {"error": {"message": "Injected error", "type": "standin"}}, "Error")
+            return
+
+        text = tutor_reply(request.get("messages", []), settings.rng)
+        tokens, finish_reason = tokenize(text, request.get("max_tokens"))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = request.get("model", "standin-tutor")
+        if request.get("stream"):
+            await self._stream(writer, completion_id, model, tokens, finish_reason)
+            return
+
+        await asyncio.sleep(settings.token_delay() * len(tokens))
+        await self._send(writer, 200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": finish_reason,
+            }],
+            "usage": {"completion_tokens": len(tokens)},
+        })
+
+    async def _stream(self, writer, completion_id, model, tokens, finish_reason):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+
+        async def event(data):
+            payload = f"data: {data}\n\n".encode('utf-8')
+            writer.write(f"{len(payload):x}\r\n".encode('latin-1') + payload + b"\r\n")
+            await writer.drain()
+
+        def chunk(delta, reason=None):
+            return json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": reason}],
+            })
+
+        delay = self.settings.token_delay()
+        await event(chunk({"role": "assistant", "content": ""}))
+        for token in tokens:
+            await event(chunk({"content": token}))
+            if delay:
+                await asyncio.sleep(delay)
+        await event(chunk({}, finish_reason))
+        await event("[DONE]")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def serve(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    def start(self):
+        """
+        Démarre le serveur dans un thread en arrière-plan (port 0 = port libre).
+        """
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.serve())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="llm-standin", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible stand-in for the tutor LLM")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttft-median", type=float, default=0.3, help="median time to first token (s)")
+    parser.add_argument("--ttft-sigma", type=float, default=0.5, help="log-normal spread of the TTFT")
+    parser.add_argument("--tokens-per-second", type=float, default=150.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 429/500/503 responses")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="share of requests never answered")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    settings = StandinSettings(args.ttft_median, args.ttft_sigma, args.tokens_per_second,
+                               args.error_rate, args.hang_rate, args.seed)
+    server = StandinServer(settings, args.host, args.port)
+
+    async def run():
+        await server.serve()
+        print(f"🤖 LLM stand-in listening on {server.base_url} (LLM_BACKEND=local)")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n👋 Stand-in stopped")
+
+
+if __name__ == "__main__":
+    main()
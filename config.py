@@ -7,9 +7,67 @@ load_dotenv()
 # Récupérer la clé API Groq depuis .env
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 
+# Backend LLM (voir modules/llm_backends.py):
+# "groq" = API Groq, "local" = serveur compatible OpenAI (benchmarks/llm_standin.py, vLLM, llama.cpp...)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")
+LLM_LOCAL_URL = os.getenv("LLM_LOCAL_URL", "http://127.0.0.1:8765/v1")
+LLM_LOCAL_MODEL = os.getenv("LLM_LOCAL_MODEL", "standin-tutor")
+
+# Client LLM partagé par llm_client et translator (voir modules/llm_service.py)
+LLM_MODEL = LLM_LOCAL_MODEL if LLM_BACKEND == "local" else "llama-3.1-8b-instant"
+LLM_MAX_CONCURRENCY = 8      # requêtes simultanées max (toutes sessions confondues)
+LLM_MAX_CONNECTIONS = 10     # taille du pool de connexions HTTP
+LLM_KEEPALIVE_EXPIRY = 60    # secondes avant fermeture d'une connexion inactive
+LLM_TIMEOUT = 30             # secondes (lecture de la réponse)
+LLM_CONNECT_TIMEOUT = 5      # secondes (établissement de la connexion)
+LLM_DEADLINE = 20            # secondes max par appel à partir de son admission, nouvelles tentatives comprises
+LLM_MAX_RETRIES = 2          # nouvelles tentatives sur erreur temporaire (429, 5xx, réseau)
+LLM_RETRY_BASE_DELAY = 0.5   # backoff exponentiel avec jitter: base * 2^tentative...
+LLM_RETRY_MAX_DELAY = 4      # ... plafonné à cette valeur (secondes)
+LLM_HEDGE = True             # 2e requête si la 1re n'a pas répondu au p95 des latences
+LLM_HEDGE_MIN_SAMPLES = 20   # latences observées avant d'activer le hedging
+LLM_BREAKER_THRESHOLD = 5    # échecs consécutifs avant d'ouvrir le disjoncteur
+LLM_BREAKER_COOLDOWN = 30    # secondes d'échec immédiat avant une requête d'essai
+
+# Ordonnanceur des requêtes LLM (voir modules/scheduler.py): limite du fournisseur
+# partagée par toutes les sessions (plan gratuit Groq; None = pas de limite)
+LLM_REQUESTS_PER_MINUTE = None if LLM_BACKEND == "local" else 30
+LLM_TOKENS_PER_MINUTE = None if LLM_BACKEND == "local" else 6000
+# Priorités (0 = la plus haute) et nombre max de requêtes en attente par classe
+LLM_PRIORITIES = {"live": 0, "summary": 1, "translation": 2, "batch": 3}
+LLM_QUEUE_LIMITS = {"live": 64, "summary": 16, "translation": 32, "batch": 128}
+# Attente max en file par classe (secondes, None = jusqu'à l'admission): l'élève
+# attend les tours live; les traductions en lot attendent le budget qu'il leur faut
+LLM_QUEUE_TIMEOUTS = {"live": LLM_DEADLINE, "summary": None, "translation": 60, "batch": None}
+
 # Paramètres de la reconnaissance vocale
 STT_LANGUAGE = "en"  # Whisper utilise "en" pas "en-US"
-STT_TIMEOUT = 10
+STT_TIMEOUT = 10             # secondes d'attente max du début de la parole
+STT_SAMPLE_RATE = 16000      # Hz (fréquence attendue par Whisper)
+
+# Moteur de reconnaissance vocale (voir modules/stt_engines.py):
+# "whisper" = openai-whisper (PyTorch fp32 sur CPU), "faster-whisper" = CTranslate2 quantifié
+STT_ENGINE = os.getenv("STT_ENGINE", "whisper")
+STT_COMPUTE_TYPE = "int8"    # quantification de faster-whisper sur CPU (int8, int8_float32, float32)
+
+# Modèle partagé par toutes les sessions (voir modules/stt_registry.py)
+STT_MODEL_SIZE = "base"      # tiny, base, small, medium, large (plus gros = plus précis mais plus lent)
+STT_THREADS = None           # threads CPU du décodage (None = valeur par défaut de torch)
+STT_WARM_UP = os.getenv("STT_WARM_UP", "1") != "0"  # charger le modèle en arrière-plan au démarrage
+
+# Détection de la parole au micro (VAD, voir modules/vad.py)
+STT_FRAME_MS = 30            # durée d'une trame analysée
+STT_VAD_THRESHOLD_DB = -40   # énergie (dBFS) au-dessus de laquelle une trame contient de la parole
+STT_VAD_START_MS = 90        # parole continue nécessaire pour démarrer (ignore les clics)
+STT_PRE_ROLL_MS = 300        # audio gardé avant le début détecté (pour ne pas couper le 1er mot)
+STT_HANGOVER_MS = 800        # silence final qui termine l'énoncé
+STT_MAX_UTTERANCE = 15       # secondes max d'un énoncé
+STT_MIC_FIXTURE = os.getenv("STT_MIC_FIXTURE")  # fichier WAV lu à la place du micro (tests sans matériel)
+
+# Transcription incrémentale pendant la parole (voir modules/streaming_stt.py)
+STT_STREAMING = True         # False = transcription de tout l'énoncé à la fin
+STT_STREAM_STEP = 1.0        # secondes de nouvel audio entre deux hypothèses partielles
+STT_STREAM_PROMPT_CHARS = 200  # derniers caractères validés donnés comme contexte au décodage
 
 # Paramètres de synthèse vocale
 TTS_RATE_DEFAULT = 150
@@ -18,10 +76,52 @@ TTS_RATE_MAX = 250
 TTS_RATE_STEP = 20
 TTS_VOLUME = 0.9
 
+# Pipeline LLM -> TTS: chaque phrase est synthétisée pendant que la suite est générée
+TTS_PIPELINE_MIN_CHARS = 20  # les phrases plus courtes sont regroupées avec la suivante
+TTS_PIPELINE_WORKERS = 2     # synthèses edge-tts en parallèle
+
 # Variable mutable pour la vitesse actuelle (peut être modifiée pendant l'exécution)
 tts_settings = {
     "rate": TTS_RATE_DEFAULT
 }
 
+# Fenêtre de contexte envoyée au LLM (tokens estimés localement)
+CONTEXT_TOKEN_BUDGET = 3000  # prompt système + résumé + tours récents
+CONTEXT_KEEP_TURNS = 6       # derniers échanges (élève + IA) envoyés tels quels
+                             # les plus anciens sont résumés en arrière-plan
+
+# Stockage des conversations
+# .jsonl = journal (un tour ajouté par ligne), .json = ancien format (tableau réécrit à chaque tour)
+# .db = base SQLite (statistiques calculées en SQL, importe l'ancien fichier au premier lancement)
+# Un ancien data/conversations.json est migré automatiquement vers le journal.
+CONVERSATIONS_FILE = "data/conversations.jsonl"
+
+# Stockage par apprenant: un journal par session dans data/learners/<apprenant>/
+# (l'ancien fichier unique est importé pour l'apprenant par défaut)
+LEARNERS_DIR = "data/learners"
+DEFAULT_LEARNER = "default"
+
+# Écriture différée: les tours sont sauvegardés par un thread en arrière-plan
+# qui regroupe les écritures (flush garanti par save(), Ctrl+C et à la sortie)
+WRITE_BEHIND = True
+WRITE_FLUSH_INTERVAL = 0.5  # secondes d'attente pour regrouper les tours
+WRITE_FSYNC = "commit"      # "commit": fsync à chaque écriture groupée, "none": laissé à l'OS
+
+# Archivage: les tours plus anciens que ARCHIVE_AFTER_DAYS quittent les journaux
+# pour des segments compressés en colonnes (data/learners/<apprenant>/archive/)
+ARCHIVE_AFTER_DAYS = 30
+ARCHIVE_SEGMENT_TURNS = 5000  # taille cible d'un segment (les petits sont fusionnés)
+ARCHIVE_INTERVAL = 3600       # secondes entre deux passes d'archivage en arrière-plan
+
+# Cache des traductions du Quick Translator (partagé entre sessions et processus)
+TRANSLATION_CACHE_FILE = "data/translation_cache.db"
+TRANSLATION_CACHE_SIZE = 5000     # entrées max (les moins récemment utilisées sont supprimées)
+TRANSLATION_CACHE_TTL = None      # secondes avant expiration d'une entrée (None = jamais)
+TRANSLATION_CACHE_MEMORY = 500    # entrées aussi gardées en mémoire (lecture sans SQLite)
+
+# Traduction par lots (export du vocabulaire)
+TRANSLATION_BATCH_TOKENS = 1200   # budget de tokens de réponse par requête
+TRANSLATION_TOKENS_PER_WORD = 40  # estimation: traduction + exemple pour un mot
+
 # Voix activée ou pas
 USE_VOICE_OUTPUT = True
@@ -1,10 +1,16 @@
 from modules.stt import listen_once
+from modules.stt_registry import warm_up_stt
 from modules.tts import speak
-from modules.llm_client import ask_llm
-from modules.feedback import extract_feedback
+from modules.speech_pipeline import SpeechPipeline
+from modules.llm_client import ask_llm_stream
+from modules.context import ContextWindow
+from modules.resilience import LLMError
+from modules.feedback import extract_feedback, response_part
 from modules.conversation import ConversationManager
 from modules.speed_control import start_speed_control, stop_speed_control
-from config import USE_VOICE_OUTPUT
+from modules.writer import flush_all
+from modules.maintenance import start_background_maintenance
+from config import USE_VOICE_OUTPUT, DEFAULT_LEARNER
 import time
 
 
@@ -24,9 +30,17 @@ def main():
     
     # Initialiser l'historique LLM
     history = []
+    # Taille des requêtes bornée: anciens échanges résumés en arrière-plan
+    context = ContextWindow()
     
     # Initialiser le gestionnaire de conversations
-    conv_manager = ConversationManager()
+    conv_manager = ConversationManager(learner_id=DEFAULT_LEARNER)
+    
+    # Archiver les anciens tours en arrière-plan
+    start_background_maintenance()
+    
+    # Charger le modèle Whisper pendant le choix du rôle et le message d'accueil
+    warm_up_stt()
     
     # Choisir un rôle
     print("Choose your tutor role:")
@@ -85,18 +99,40 @@ def main():
             print("="*60 + "\n")
             break
         
-        # ÉTAPE 2 : Appeler l'IA Groq
-        print(f"\n💭 Thinking...")
-        response, history = ask_llm(history, user_text, role=role)
+        # ÉTAPE 2 : Appeler l'IA Groq (réponse affichée au fil de l'eau)
+        print(f"\n{'─'*60}")
+        print(f"🎤 You: {user_text}")
+        print(f"{'─'*60}")
+        print("🤖 Tutor: ", end="", flush=True)
+        chunks, history = ask_llm_stream(history, user_text, role=role, context=context)
+        # Chaque phrase terminée est synthétisée pendant la suite de la génération
+        pipeline = SpeechPipeline() if USE_VOICE_OUTPUT else None
+        response = ""
+        shown = ""
+        try:
+            for chunk in chunks:
+                response += chunk
+                if pipeline is not None:
+                    pipeline.feed(chunk)
+                # Seule la partie conversationnelle est affichée pendant le flux
+                visible = response_part(response)
+                if visible.startswith(shown):
+                    print(visible[len(shown):], end="", flush=True)
+                    shown = visible
+        except LLMError as e:
+            # Pas de réponse: le tour n'est ni prononcé ni sauvegardé
+            print(f"\n⚠️ {e.user_message}")
+            if pipeline is not None:
+                pipeline.finish()
+            continue
+        print()
+        if pipeline is not None:
+            pipeline.finish()
         
         # ÉTAPE 3 : Extraire le feedback
         feedback = extract_feedback(response)
         
-        # ÉTAPE 4 : Afficher la réponse avec feedback structuré
-        print(f"\n{'─'*60}")
-        print(f"🎤 You: {user_text}")
-        print(f"{'─'*60}")
-        print(f"🤖 Tutor: {feedback['response']}")
+        # ÉTAPE 4 : Afficher le feedback structuré
         
         # Afficher les corrections
         if feedback['corrections'] and feedback['corrections'] != ["None - well done!"]:
@@ -123,9 +159,9 @@ def main():
         
         print(f"{'─'*60}\n")
         
-        # ÉTAPE 5 : Parler la réponse
-        if USE_VOICE_OUTPUT:
-            speak(feedback['response'])
+        # ÉTAPE 5 : Parler la réponse (attendre les dernières phrases)
+        if pipeline is not None:
+            pipeline.wait()
         
         # ÉTAPE 6 : Sauvegarder le tour
         conv_manager.add_turn(user_text, response, feedback)
@@ -137,10 +173,13 @@ if __name__ == "__main__":
         main()
     except KeyboardInterrupt:
         stop_speed_control()
+        # Écrire les derniers tours encore en attente
+        flush_all()
         print("\n\n⏹️ Interrupted by user.")
         print("Goodbye!")
     except Exception as e:
         stop_speed_control()
+        flush_all()
         print(f"\n❌ Unexpected error: {e}")
         import traceback
         traceback.print_exc()
@@ -0,0 +1,270 @@
+import json
+import os
+from collections import Counter
+from modules.columnar import ColumnarView, numpy_available
+from modules.fileutils import atomic_write_bytes
+from modules.timerange import to_day, sorted_range, group_daily
+
+
+def aggregates_filename(filename):
+    """
+    Retourne le chemin du fichier d'agrégats associé à un fichier de conversations.
+    Ex: data/conversations.jsonl -> data/conversations.jsonl.stats.json
+    """
+    return filename + ".stats.json"
+
+
+class ProgressAggregates:
+    """
+    Statistiques de progression maintenues de façon incrémentale:
+    chaque nouveau tour les met à jour en O(1), sans relire l'historique.
+    Expose la même interface de requêtes que SQLiteStore, ce qui permet
+    à ProgressTracker d'utiliser l'un ou l'autre indifféremment.
+    """
+
+    VERSION = 1
+
+    # Champs lus dans chaque tour (ai_full_response n'est jamais nécessaire)
+    FIELDS = ("timestamp", "user", "ai_response", "corrections", "vocabulary", "grammar_tips")
+
+    def __init__(self):
+        self.turns = 0
+        self.words_spoken = 0
+        self.words_heard = 0
+        self.correction_free = 0
+        self.errors = Counter()
+        # dict utilisé comme ensemble ordonné (ordre de découverte)
+        self.vocabulary = {}
+        self.grammar_tips = {}
+        self.daily = {}
+        # Version du stockage source au moment de la dernière mise à jour
+        self.source_version = None
+
+    def add_turn(self, turn):
+        """
+        Intègre un tour dans les agrégats.
+        """
+        user_words = len(turn.get("user", "").split())
+
+        self.turns += 1
+        self.words_spoken += user_words
+        self.words_heard += len(turn.get("ai_response", "").split())
+
+        corrections = turn.get("corrections", [])
+        if not corrections or corrections == ["None - well done!"]:
+            self.correction_free += 1
+        for correction in corrections:
+            if correction.strip() and correction != "None - well done!":
+                self.errors[correction] += 1
+
+        for vocab in turn.get("vocabulary", []):
+            if vocab.strip():
+                self.vocabulary[vocab] = None
+        for tip in turn.get("grammar_tips", []):
+            if tip.strip():
+                self.grammar_tips[tip] = None
+
+        timestamp = turn.get("timestamp", "")
+        if timestamp:
+            date = timestamp.split("T")[0]
+            if date not in self.daily:
+                self.daily[date] = {"turns": 0, "words": 0}
+            self.daily[date]["turns"] += 1
+            self.daily[date]["words"] += user_words
+
+    @classmethod
+    def from_turns(cls, turns):
+        """
+        Construit les agrégats en un seul passage sur des tours
+        (liste ou itérateur: la mémoire utilisée ne dépend pas de l'historique).
+        """
+        aggregates = cls()
+        for turn in turns:
+            aggregates.add_turn(turn)
+        return aggregates
+
+    @classmethod
+    def from_columnar(cls, view):
+        """
+        Agrégats équivalents à une vue colonnaire (réductions vectorisées).
+        """
+        aggregates = cls()
+        aggregates.turns = view.count()
+        aggregates.words_spoken = view.total_words_spoken()
+        aggregates.words_heard = view.total_words_heard()
+        aggregates.correction_free = view.correction_free_turns()
+        aggregates.errors = Counter(dict(zip(view.error_table, view.error_counts.tolist())))
+        aggregates.vocabulary = dict.fromkeys(view.vocabulary_table)
+        aggregates.grammar_tips = dict.fromkeys(view.grammar_tip_table)
+        aggregates.daily = view.daily_progress()
+        return aggregates
+
+    def merge(self, other):
+        """
+        Ajoute les agrégats d'un autre journal (ex: une autre session).
+        """
+        self.turns += other.turns
+        self.words_spoken += other.words_spoken
+        self.words_heard += other.words_heard
+        self.correction_free += other.correction_free
+        self.errors.update(other.errors)
+        self.vocabulary.update(other.vocabulary)
+        self.grammar_tips.update(other.grammar_tips)
+        for date, stats in other.daily.items():
+            if date not in self.daily:
+                self.daily[date] = {"turns": 0, "words": 0}
+            self.daily[date]["turns"] += stats["turns"]
+            self.daily[date]["words"] += stats["words"]
+        return self
+
+    # --- Interface de requêtes (mêmes noms que SQLiteStore) ---
+
+    def count(self):
+        return self.turns
+
+    def total_words_spoken(self):
+        return self.words_spoken
+
+    def total_words_heard(self):
+        return self.words_heard
+
+    def correction_free_turns(self):
+        return self.correction_free
+
+    def recurring_errors(self, top_n=5):
+        return self.errors.most_common(top_n)
+
+    def distinct_texts(self, table):
+        if table == "vocabulary":
+            return set(self.vocabulary)
+        if table == "grammar_tips":
+            return set(self.grammar_tips)
+        raise ValueError(f"Unknown table: {table}")
+
+    def daily_progress(self, start=None, end=None, granularity="day"):
+        """
+        Statistiques {période: {turns, words}} entre deux dates (end exclue):
+        les jours de la période sont trouvés par dichotomie sur les dates triées.
+        """
+        if start is None and end is None and granularity == "day":
+            return {date: dict(stats) for date, stats in self.daily.items()}
+        days = sorted(self.daily)
+        lo, hi = sorted_range(days, to_day(start), to_day(end))
+        return group_daily(((day, self.daily[day]) for day in days[lo:hi]), granularity)
+
+    # --- Persistance ---
+
+    def to_dict(self):
+        return {
+            "version": self.VERSION,
+            "source_version": self.source_version,
+            "turns": self.turns,
+            "words_spoken": self.words_spoken,
+            "words_heard": self.words_heard,
+            "correction_free": self.correction_free,
+            "errors": dict(self.errors),
+            "vocabulary": list(self.vocabulary),
+            "grammar_tips": list(self.grammar_tips),
+            "daily": self.daily,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != cls.VERSION:
+            raise ValueError(f"Unsupported aggregates version: {data.get('version')}")
+        aggregates = cls()
+        aggregates.source_version = data.get("source_version")
+        aggregates.turns = data["turns"]
+        aggregates.words_spoken = data["words_spoken"]
+        aggregates.words_heard = data["words_heard"]
+        aggregates.correction_free = data["correction_free"]
+        aggregates.errors = Counter(data["errors"])
+        aggregates.vocabulary = dict.fromkeys(data["vocabulary"])
+        aggregates.grammar_tips = dict.fromkeys(data["grammar_tips"])
+        aggregates.daily = data["daily"]
+        return aggregates
+
+    def save(self, filename):
+        """
+        Écrit les agrégats (fichier temporaire propre à l'écrivain puis
+        renommage atomique: thread d'écriture et reconstructions concurrents).
+        """
+        data = json.dumps(self.to_dict(), ensure_ascii=False)
+        atomic_write_bytes(filename, data.encode('utf-8'))
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def build_aggregates(turns):
+    """
+    Reconstruit les agrégats en un seul passage sur des tours: vue
+    colonnaire NumPy, ou mise à jour tour par tour si NumPy est absent.
+    """
+    if numpy_available():
+        return ProgressAggregates.from_columnar(ColumnarView.from_turns(turns))
+    return ProgressAggregates.from_turns(turns)
+
+
+def load_aggregates(store):
+    """
+    Retourne les agrégats à jour pour un stockage sans requêtes SQL
+    (SQLiteStore calcule les mêmes statistiques en SQL).
+    Utilise le fichier persisté s'il correspond à la version actuelle du
+    stockage, sinon reconstruit les agrégats depuis l'historique et les sauvegarde
+    (agrégats vides, non sauvegardés, si le fichier n'existe pas encore).
+    Les tours archivés ne sont pas inclus (voir load_total_aggregates).
+    Pour un stockage partitionné, chaque journal a ses propres agrégats et
+    seuls les journaux modifiés sont relus avant la fusion.
+    """
+    if hasattr(store, "shards"):
+        merged = ProgressAggregates()
+        for shard in store.shards():
+            merged.merge(load_aggregates(shard))
+        merged.source_version = store.version()
+        return merged
+
+    # Journal pas encore créé (nouvelle session): rien à persister avant
+    # le premier tour écrit
+    if not store.exists():
+        return ProgressAggregates()
+
+    filename = aggregates_filename(store.filename)
+    version = store.version()
+
+    if os.path.exists(filename):
+        try:
+            aggregates = ProgressAggregates.load(filename)
+            if aggregates.source_version == version:
+                return aggregates
+        except Exception as e:
+            print(f"⚠️ Rebuilding progress aggregates: {e}")
+
+    turns = store.iter_turns(fields=ProgressAggregates.FIELDS, include_archive=False)
+    aggregates = build_aggregates(turns)
+    aggregates.source_version = version
+    try:
+        aggregates.save(filename)
+    except Exception as e:
+        print(f"❌ Error saving progress aggregates: {e}")
+    return aggregates
+
+
+def load_total_aggregates(store):
+    """
+    Agrégats de tout l'historique: ceux du stockage actif (load_aggregates)
+    plus ceux des segments archivés, lus depuis les manifestes uniquement.
+    """
+    active = load_aggregates(store)
+    archives = [archive for archive in store.archives() if archive.exists()]
+    if not archives:
+        return active
+
+    total = ProgressAggregates()
+    for archive in archives:
+        total.merge(archive.aggregates())
+    total.merge(active)
+    total.source_version = active.source_version
+    return total
@@ -1,59 +1,84 @@
-import json
 import os
-from collections import Counter
-from datetime import datetime
+import threading
+from config import CONVERSATIONS_FILE, LEARNERS_DIR, DEFAULT_LEARNER
+from modules.storage import open_store, list_shard_files, learner_directories, ShardedStore
+from modules.aggregates import ProgressAggregates, build_aggregates, load_total_aggregates
 
 
 class ProgressTracker:
     """
     Analyse les progrès de l'utilisateur à partir des conversations sauvegardées.
+    Les statistiques viennent des requêtes SQL indexées (backend SQLite) ou
+    des agrégats persistés à côté des données (mis à jour à chaque tour par
+    ConversationManager, reconstruits par la vue colonnaire NumPy s'ils sont
+    périmés), en secours d'un seul passage en flux sur l'historique.
     """
     
-    def __init__(self, conversations_file="data/conversations.json"):
+    def __init__(self, conversations_file=CONVERSATIONS_FILE, learner_id=None):
         """
         Initialise le tracker avec le fichier de conversations.
+        Avec un learner_id, lit les journaux de cet apprenant
+        (ALL_LEARNERS: fusionne tous les apprenants).
         """
         self.conversations_file = conversations_file
-        self.conversations = []
-        self.load_conversations()
+        self.learner_id = learner_id
+        if learner_id is not None:
+            # L'ancien fichier unique est repris par l'apprenant par défaut
+            legacy_file = conversations_file if learner_id == DEFAULT_LEARNER else None
+            self.store = ShardedStore(LEARNERS_DIR, learner_id, legacy_file=legacy_file)
+        else:
+            self.store = open_store(conversations_file)
+        self.stats = None  # Source des statistiques (SQLite ou agrégats)
+        if self.store.supports_queries:
+            self.stats = self.store
+        else:
+            try:
+                self.stats = load_total_aggregates(self.store)
+            except Exception as e:
+                print(f"❌ Error loading progress aggregates: {e}")
+        if self.stats is None:
+            # Un seul passage en flux sur l'historique, sans le garder en mémoire
+            self.stats = build_aggregates(self.iter_turns(ProgressAggregates.FIELDS))
     
-    def load_conversations(self):
+    def iter_turns(self, fields=None):
         """
-        Charge les conversations depuis le fichier JSON.
+        Itère sur les tours sauvegardés sans charger tout l'historique.
+        
+        Args:
+            fields: champs à garder pour chaque tour (None = tous)
         """
-        if os.path.exists(self.conversations_file):
-            try:
-                with open(self.conversations_file, 'r', encoding='utf-8') as f:
-                    self.conversations = json.load(f)
-            except Exception as e:
-                print(f"❌ Error loading conversations: {e}")
-                self.conversations = []
+        try:
+            yield from self.store.iter_turns(fields)
+        except Exception as e:
+            print(f"❌ Error reading conversations: {e}")
+    
+    def turns_between(self, start=None, end=None, fields=None):
+        """
+        Tours dont le timestamp est dans [start, end) (datetime, date ou chaîne ISO),
+        lus via l'index de timestamps du stockage.
+        """
+        try:
+            yield from self.store.turns_between(start, end, fields)
+        except Exception as e:
+            print(f"❌ Error reading conversations: {e}")
     
     def get_total_turns(self):
         """
         Retourne le nombre total de tours de conversation.
         """
-        return len(self.conversations)
+        return self.stats.count()
     
     def get_total_words_spoken(self):
         """
         Retourne le nombre total de mots parlés par l'utilisateur.
         """
-        total = 0
-        for turn in self.conversations:
-            words = turn.get("user", "").split()
-            total += len(words)
-        return total
+        return self.stats.total_words_spoken()
     
     def get_total_words_heard(self):
         """
         Retourne le nombre total de mots entendus de l'IA.
         """
-        total = 0
-        for turn in self.conversations:
-            words = turn.get("ai_response", "").split()
-            total += len(words)
-        return total
+        return self.stats.total_words_heard()
     
     def get_recurring_errors(self, top_n=5):
         """
@@ -62,15 +87,7 @@ class ProgressTracker:
         Returns:
             list: Liste des (erreur, count) triée par fréquence
         """
-        error_counter = Counter()
-        
-        for turn in self.conversations:
-            corrections = turn.get("corrections", [])
-            for correction in corrections:
-                if correction.strip() and correction != "None - well done!":
-                    error_counter[correction] += 1
-        
-        return error_counter.most_common(top_n)
+        return self.stats.recurring_errors(top_n)
     
     def get_vocabulary_learned(self):
         """
@@ -79,15 +96,7 @@ class ProgressTracker:
         Returns:
             set: Ensemble des mots/expressions de vocabulaire
         """
-        vocab_set = set()
-        
-        for turn in self.conversations:
-            vocabulary = turn.get("vocabulary", [])
-            for vocab in vocabulary:
-                if vocab.strip():
-                    vocab_set.add(vocab)
-        
-        return vocab_set
+        return self.stats.distinct_texts("vocabulary")
     
     def get_grammar_tips(self):
         """
@@ -96,23 +105,12 @@ class ProgressTracker:
         Returns:
             set: Ensemble des tips grammaticaux
         """
-        tips_set = set()
-        
-        for turn in self.conversations:
-            tips = turn.get("grammar_tips", [])
-            for tip in tips:
-                if tip.strip():
-                    tips_set.add(tip)
-        
-        return tips_set
+        return self.stats.distinct_texts("grammar_tips")
     
     def get_average_words_per_turn(self):
         """
         Retourne la moyenne de mots par turn de l'utilisateur.
         """
-        if not self.conversations:
-            return 0
-        
         total_words = self.get_total_words_spoken()
         turns = self.get_total_turns()
         
@@ -122,13 +120,7 @@ class ProgressTracker:
         """
         Retourne le nombre de turns sans correction (excellents tours).
         """
-        count = 0
-        for turn in self.conversations:
-            corrections = turn.get("corrections", [])
-            if not corrections or corrections == ["None - well done!"]:
-                count += 1
-        
-        return count
+        return self.stats.correction_free_turns()
     
     def get_report(self):
         """
@@ -174,28 +166,67 @@ class ProgressTracker:
         
         return report
     
-    def get_daily_progress(self):
+    def get_daily_progress(self, start=None, end=None, granularity="day"):
         """
-        Retourne les statistiques groupées par jour.
+        Retourne les statistiques groupées par jour (ou par semaine / mois).
+        
+        Args:
+            start: première date incluse (None = depuis le début)
+            end: date de fin exclue (None = jusqu'à aujourd'hui)
+            granularity: "day", "week" (clé = lundi) ou "month" (clé = YYYY-MM)
         
         Returns:
             dict: {date: {turns, words}}
         """
-        daily_stats = {}
-        
-        for turn in self.conversations:
-            timestamp = turn.get("timestamp", "")
-            if not timestamp:
-                continue
-            
-            # Extraire la date (format: 2025-12-18T...)
-            date = timestamp.split("T")[0]
-            
-            if date not in daily_stats:
-                daily_stats[date] = {"turns": 0, "words": 0}
-            
-            daily_stats[date]["turns"] += 1
-            words = len(turn.get("user", "").split())
-            daily_stats[date]["words"] += words
-        
-        return daily_stats
+        return self.stats.daily_progress(start, end, granularity)
+
+
+# Cache des trackers partagé par toutes les sessions du processus (Streamlit)
+_tracker_cache = {}
+_tracker_cache_lock = threading.Lock()
+
+
+def _file_fingerprint(conversations_file, learner_id=None):
+    """
+    Empreinte (mtime, taille, inode) du fichier de conversations et de son
+    éventuel journal WAL SQLite, ou des journaux de l'apprenant, ainsi que
+    des manifestes d'archive.
+    De simples stat(), sans lire le contenu.
+    """
+    if learner_id is None:
+        paths = [conversations_file, conversations_file + "-wal"]
+        archives = [conversations_file + ".archive"]
+    else:
+        paths = list_shard_files(LEARNERS_DIR, learner_id)
+        archives = [os.path.join(directory, "archive") for directory in learner_directories(LEARNERS_DIR, learner_id)]
+    # Manifestes d'archive: changent à chaque archivage ou compaction
+    paths += [os.path.join(directory, "manifest.json") for directory in archives]
+
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            fingerprint.append(None)
+            continue
+        fingerprint.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+    return tuple(fingerprint)
+
+
+def get_progress_tracker(conversations_file=CONVERSATIONS_FILE, learner_id=None):
+    """
+    Retourne un ProgressTracker partagé pour ce fichier (ou cet apprenant).
+    Le tracker n'est reconstruit que si l'empreinte des fichiers a changé:
+    les réexécutions Streamlit sans nouvelles données ne relisent rien.
+    """
+    key = (conversations_file, learner_id)
+    fingerprint = _file_fingerprint(conversations_file, learner_id)
+    with _tracker_cache_lock:
+        cached = _tracker_cache.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        tracker = ProgressTracker(conversations_file, learner_id)
+        # Empreinte relue après construction (la migration peut créer le fichier)
+        _tracker_cache[key] = (_file_fingerprint(conversations_file, learner_id), tracker)
+        return tracker
@@ -0,0 +1,258 @@
+import gzip
+import heapq
+import json
+import os
+import uuid
+from config import ARCHIVE_SEGMENT_TURNS
+from modules.aggregates import ProgressAggregates, build_aggregates
+from modules.feedback import extract_feedback
+from modules.fileutils import atomic_write_bytes, file_lock
+
+
+SEGMENT_VERSION = 1
+
+# Colonnes stockées telles quelles dans un segment
+COLUMNS = ("timestamp", "user", "ai_full_response")
+
+# Champs recalculés depuis ai_full_response (extract_feedback): ils ne sont
+# stockés que pour les tours où ils diffèrent du résultat du parsing
+DERIVED_FIELDS = ("ai_response", "corrections", "vocabulary", "grammar_tips")
+
+
+def _derive(ai_full_response):
+    sections = extract_feedback(ai_full_response)
+    return {
+        "ai_response": sections["response"],
+        "corrections": sections["corrections"],
+        "vocabulary": sections["vocabulary"],
+        "grammar_tips": sections["grammar_tips"],
+    }
+
+
+def encode_segment(turns):
+    """
+    Encode des tours en segment colonnaire compressé (JSON + gzip).
+    La réponse de l'IA n'est stockée qu'une fois: les champs parsés sont
+    recalculés à la lecture, sauf exceptions gardées dans `overrides`.
+    """
+    columns = {name: [] for name in COLUMNS}
+    overrides = {}
+    for i, turn in enumerate(turns):
+        for name in COLUMNS:
+            columns[name].append(turn.get(name, ""))
+        derived = _derive(turn.get("ai_full_response", ""))
+        extra = {
+            key: value for key, value in turn.items()
+            if key not in COLUMNS and derived.get(key) != value
+        }
+        if extra:
+            overrides[str(i)] = extra
+
+    payload = {
+        "version": SEGMENT_VERSION,
+        "count": len(columns["timestamp"]),
+        "columns": columns,
+        "overrides": overrides,
+    }
+    return gzip.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+
+def read_segment(path, fields=None):
+    """
+    Itère sur les tours d'un segment (dans l'ordre chronologique).
+    Le parsing de ai_full_response n'est fait que si un champ dérivé est demandé.
+    """
+    with open(path, 'rb') as f:
+        payload = json.loads(gzip.decompress(f.read()).decode('utf-8'))
+    if payload.get("version") != SEGMENT_VERSION:
+        raise ValueError(f"Unsupported segment version in {path}: {payload.get('version')}")
+
+    columns = payload["columns"]
+    overrides = payload["overrides"]
+    stored = [name for name in COLUMNS if fields is None or name in fields]
+    derived = [name for name in DERIVED_FIELDS if fields is None or name in fields]
+
+    for i in range(payload["count"]):
+        turn = {name: columns[name][i] for name in stored}
+        if derived:
+            values = _derive(columns["ai_full_response"][i])
+            for name in derived:
+                turn[name] = values[name]
+        extra = overrides.get(str(i))
+        if extra:
+            turn.update(
+                (key, value) for key, value in extra.items()
+                if fields is None or key in fields
+            )
+        yield turn
+
+
+class SegmentArchive:
+    """
+    Archive de tours anciens: segments immuables compressés et un manifeste
+    (manifest.json) qui décrit chaque segment (fichier, nombre de tours,
+    timestamps min/max, journal d'origine et agrégats de progression).
+    Les statistiques viennent du manifeste: les segments ne sont lus que
+    pour les requêtes dont la période les recouvre.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, "manifest.json")
+
+    def segments(self):
+        """
+        Entrées du manifeste triées par timestamp minimal.
+        """
+        if not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return sorted(json.load(f)["segments"], key=lambda s: s["min_timestamp"])
+
+    def _write_manifest(self, segments):
+        data = json.dumps({"version": SEGMENT_VERSION, "segments": segments}, ensure_ascii=False)
+        atomic_write_bytes(self.manifest_path, data.encode('utf-8'))
+
+    def exists(self):
+        return bool(self.segments())
+
+    def version(self):
+        """
+        Empreinte du manifeste: change à chaque archivage ou compaction.
+        """
+        if not os.path.exists(self.manifest_path):
+            return None
+        stat = os.stat(self.manifest_path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def count(self):
+        return sum(segment["count"] for segment in self.segments())
+
+    def archived_until(self, source):
+        """
+        Dernier timestamp archivé pour un journal d'origine (None si aucun).
+        """
+        timestamps = [
+            segment["sources"][source] for segment in self.segments()
+            if source in segment["sources"]
+        ]
+        return max(timestamps) if timestamps else None
+
+    def aggregates(self):
+        """
+        Agrégats de tous les segments, lus depuis le manifeste uniquement.
+        """
+        merged = ProgressAggregates()
+        for segment in self.segments():
+            merged.merge(ProgressAggregates.from_dict(segment["stats"]))
+        return merged
+
+    def iter_turns(self, fields=None, start=None, end=None):
+        """
+        Itère sur les tours archivés par ordre chronologique.
+        Avec start/end (timestamps ISO, end exclu), seuls les segments dont
+        l'intervalle [min, max] recouvre la période sont ouverts.
+        """
+        read_fields = None if fields is None else tuple(fields) + ("timestamp",)
+        streams = [
+            read_segment(os.path.join(self.directory, segment["file"]), read_fields)
+            for segment in self.segments()
+            if (start is None or segment["max_timestamp"] >= start)
+            and (end is None or segment["min_timestamp"] < end)
+        ]
+        for turn in heapq.merge(*streams, key=lambda t: t.get("timestamp", "")):
+            timestamp = turn.get("timestamp", "")
+            if start is not None and timestamp < start:
+                continue
+            if end is not None and timestamp >= end:
+                continue
+            if fields is not None:
+                turn = {key: turn[key] for key in fields if key in turn}
+            yield turn
+
+    def _write_segment(self, turns, sources):
+        """
+        Écrit un segment et retourne son entrée de manifeste.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        timestamps = [turn.get("timestamp", "") for turn in turns]
+        name = f"segment-{min(timestamps)[:10] or 'unknown'}-{uuid.uuid4().hex[:8]}.json.gz"
+        data = encode_segment(turns)
+        atomic_write_bytes(os.path.join(self.directory, name), data)
+        return {
+            "file": name,
+            "count": len(turns),
+            "bytes": len(data),
+            "min_timestamp": min(timestamps),
+            "max_timestamp": max(timestamps),
+            "sources": sources,
+            "stats": build_aggregates(turns).to_dict(),
+        }
+
+    def add_segment(self, turns, source):
+        """
+        Archive des tours (chronologiques) provenant du journal `source`.
+        Le segment est écrit avant d'être ajouté au manifeste.
+        """
+        if not turns:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self._write_segment(turns, {source: max(t.get("timestamp", "") for t in turns)})
+        with file_lock(self.manifest_path):
+            self._write_manifest(self.segments() + [entry])
+        return entry
+
+    def compact(self, target_turns=ARCHIVE_SEGMENT_TURNS):
+        """
+        Fusionne les petits segments consécutifs (par timestamp) en segments
+        d'au plus `target_turns` tours. Les anciens fichiers sont supprimés
+        après la mise à jour du manifeste.
+
+        Returns:
+            int: Nombre de segments fusionnés
+        """
+        if not os.path.exists(self.manifest_path):
+            return 0
+
+        with file_lock(self.manifest_path):
+            segments = self.segments()
+
+            # Groupes de segments consécutifs qui tiennent dans un segment cible
+            groups = []
+            current = []
+            for segment in segments:
+                if current and sum(s["count"] for s in current) + segment["count"] > target_turns:
+                    groups.append(current)
+                    current = []
+                current.append(segment)
+            if current:
+                groups.append(current)
+
+            merged_count = 0
+            result = []
+            for group in groups:
+                if len(group) == 1:
+                    result.extend(group)
+                    continue
+                streams = [read_segment(os.path.join(self.directory, s["file"])) for s in group]
+                turns = list(heapq.merge(*streams, key=lambda t: t.get("timestamp", "")))
+                sources = {}
+                for segment in group:
+                    for source, timestamp in segment["sources"].items():
+                        sources[source] = max(sources.get(source, timestamp), timestamp)
+                result.append(self._write_segment(turns, sources))
+                merged_count += len(group)
+
+            if not merged_count:
+                return 0
+            self._write_manifest(result)
+
+        # Le manifeste ne référence plus les anciens segments
+        kept = {segment["file"] for segment in result}
+        for segment in segments:
+            if segment["file"] not in kept:
+                try:
+                    os.remove(os.path.join(self.directory, segment["file"]))
+                except OSError:
+                    pass
+        return merged_count
@@ -0,0 +1,149 @@
+import io
+import threading
+import time
+import wave
+import numpy as np
+from config import STT_MIC_FIXTURE, STT_SAMPLE_RATE
+
+
+def decode_wav(source):
+    """
+    Décode un WAV PCM (8/16/24/32 bits) en mémoire, en float32 mono (moyenne
+    des canaux). `source`: chemin, octets ou objet fichier (ex: st.audio_input).
+
+    Returns:
+        tuple: (échantillons, fréquence d'échantillonnage)
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif hasattr(source, "seek"):
+        source.seek(0)
+    with wave.open(source, 'rb') as f:
+        channels = f.getnchannels()
+        width = f.getsampwidth()
+        rate = f.getframerate()
+        data = f.readframes(f.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768
+    elif width == 3:
+        # 24 bits: compléter chaque échantillon en entier 32 bits (octet de poids faible nul)
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((len(raw), 4), dtype=np.uint8)
+        padded[:, 1:] = raw
+        samples = padded.view('<i4').ravel().astype(np.float32) / 2147483648
+    elif width == 4:
+        samples = np.frombuffer(data, dtype='<i4').astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width * 8} bits")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def resample(samples, rate, target=STT_SAMPLE_RATE):
+    """
+    Rééchantillonne un signal en mémoire par FFT (limité en bande: pas de
+    repliement quand la fréquence diminue, ex: 48 kHz -> 16 kHz).
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if rate == target or len(samples) == 0:
+        return samples
+    count = int(round(len(samples) * target / rate))
+    spectrum = np.fft.rfft(samples)
+    size = count // 2 + 1
+    if len(spectrum) >= size:
+        spectrum = spectrum[:size]
+    else:
+        spectrum = np.concatenate([spectrum, np.zeros(size - len(spectrum), dtype=spectrum.dtype)])
+    return (np.fft.irfft(spectrum, count) * (count / len(samples))).astype(np.float32)
+
+
+def load_audio(source, samplerate=STT_SAMPLE_RATE):
+    """
+    Audio prêt pour Whisper (float32 mono à `samplerate`), sans fichier
+    temporaire ni ffmpeg. `source`: tableau NumPy (déjà à `samplerate`,
+    les canaux éventuels sont moyennés), octets WAV, objet fichier ou
+    chemin d'un fichier WAV.
+
+    Raises:
+        wave.Error: le fichier n'est pas un WAV PCM
+    """
+    if isinstance(source, np.ndarray):
+        samples = source.astype(np.float32, copy=False)
+        return samples.mean(axis=1) if samples.ndim > 1 else samples
+    samples, rate = decode_wav(source)
+    return resample(samples, rate, samplerate)
+
+
+class WavInputStream:
+    """
+    Micro de substitution: même interface que sounddevice.InputStream
+    (gestionnaire de contexte, callback(indata, frames, time, status)),
+    alimenté par un fichier WAV puis par du silence.
+    - realtime=True: les blocs arrivent au rythme réel (comme un vrai micro)
+    - realtime=False: aussi vite que possible (tests rapides)
+    """
+
+    def __init__(self, path, samplerate, blocksize, callback, channels=1, dtype='float32',
+                 realtime=True, trailing_silence=3.0, **kwargs):
+        samples = load_audio(path, samplerate)
+        silence = np.zeros(int(trailing_silence * samplerate), dtype=np.float32)
+        self.samples = np.concatenate([samples, silence])
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.callback = callback
+        self.channels = channels
+        self.realtime = realtime
+        self.active = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        start = time.monotonic()
+        for i, offset in enumerate(range(0, len(self.samples), self.blocksize)):
+            if self._stop.is_set():
+                break
+            block = self.samples[offset:offset + self.blocksize]
+            indata = np.repeat(block[:, None], self.channels, axis=1)
+            self.callback(indata, len(block), None, None)
+            if self.realtime:
+                # Rythme d'un vrai micro: un bloc toutes les blocksize/samplerate secondes
+                delay = start + (i + 1) * self.blocksize / self.samplerate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+        self.active = False
+
+    def start(self):
+        self.active = True
+        self._thread = threading.Thread(target=self._run, name="wav-input", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.active = False
+
+    def close(self):
+        self.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_input_stream(**kwargs):
+    """
+    Ouvre le flux du micro (sounddevice.InputStream), ou le micro de
+    substitution si STT_MIC_FIXTURE désigne un fichier WAV.
+    """
+    if STT_MIC_FIXTURE:
+        return WavInputStream(STT_MIC_FIXTURE, **kwargs)
+    import sounddevice as sd
+    return sd.InputStream(**kwargs)
@@ -0,0 +1,168 @@
+import re
+from collections import Counter
+from itertools import chain
+from modules.timerange import to_day, sorted_range, group_daily
+
+# numpy est optionnel (voir requirements.txt) et importé au premier usage
+# (voir numpy_available): il ne ralentit pas le démarrage de l'application
+np = None
+
+
+# Séparateur des textes concaténés: espace au sens de str.split(), absent des textes saisis
+_SEPARATOR = "\x1f"
+# Espaces non ASCII au sens de str.split() (les autres octets non ASCII ne sont pas des espaces)
+_UNICODE_SPACES = re.compile("[\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]")
+
+_NO_CORRECTION = "None - well done!"
+
+
+def numpy_available():
+    """Indique si la vue colonnaire peut être utilisée (importe numpy au premier appel)."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+
+def _word_counts(texts):
+    """
+    Compte les mots de chaque texte comme len(text.split()), sans split:
+    tous les textes sont concaténés en un seul tableau d'octets UTF-8 et
+    on compte les débuts de mots (octet non-espace précédé d'un espace)
+    entre deux séparateurs.
+    """
+    if not texts:
+        return np.zeros(0, dtype=np.int64)
+
+    joined = _SEPARATOR + _SEPARATOR.join(texts) + _SEPARATOR
+    if joined.count(_SEPARATOR) != len(texts) + 1 or (
+            not joined.isascii() and _UNICODE_SPACES.search(joined)):
+        # Séparateur dans un texte ou espaces Unicode: comptage exact par str.split
+        return np.fromiter(map(len, map(str.split, texts)), dtype=np.int64, count=len(texts))
+
+    codes = np.frombuffer(joined.encode("utf-8", "surrogatepass"), dtype=np.uint8)
+    # Espaces ASCII: \t\n\v\f\r (9-13) et \x1c-\x1f, " " (28-32); les soustractions
+    # débordent (uint8) pour les octets inférieurs
+    is_space = ((codes - 9) <= 4) | ((codes - 28) <= 4)
+    word_starts = np.flatnonzero(~is_space[1:] & is_space[:-1])
+    separators = np.flatnonzero(codes == ord(_SEPARATOR))
+    return np.diff(np.searchsorted(word_starts, separators))
+
+
+def _distinct(lists):
+    """
+    Textes non vides de toutes les listes, sans doublons (ordre de première apparition).
+    """
+    return [text for text in dict.fromkeys(chain.from_iterable(lists)) if text.strip()]
+
+
+class ColumnarView:
+    """
+    Vue colonnaire en mémoire de l'historique, construite en un seul passage:
+    tableaux NumPy (mots par tour, jour, tour sans correction) et tables de
+    chaînes internées. Toutes les statistiques sont des réductions vectorisées.
+    Expose la même interface de requêtes que SQLiteStore et ProgressAggregates;
+    c'est elle qui reconstruit les agrégats persistés (voir build_aggregates).
+    """
+
+    # Champs lus dans chaque tour (ai_full_response n'est jamais nécessaire) et leur valeur par défaut
+    DEFAULTS = (
+        ("timestamp", ""), ("user", ""), ("ai_response", ""),
+        ("corrections", []), ("vocabulary", []), ("grammar_tips", []),
+    )
+    FIELDS = tuple(field for field, _ in DEFAULTS)
+
+    def __init__(self, turns):
+        if not numpy_available():
+            raise ImportError("ColumnarView requires numpy")
+        # Unique passage sur les tours (itérateur possible): colonnes brutes
+        columns = {field: [] for field in self.FIELDS}
+        appends = [(field, columns[field].append, default) for field, default in self.DEFAULTS]
+        for turn in turns:
+            for field, append, default in appends:
+                append(turn.get(field, default))
+
+        self.user_words = _word_counts(columns["user"])
+        self.ai_words = _word_counts(columns["ai_response"])
+
+        # Jours: table internée puis triée + ordinal par tour (-1 = pas de timestamp)
+        interned = {}
+        day_codes = np.fromiter(
+            (interned.setdefault(timestamp.split("T")[0], len(interned)) for timestamp in columns["timestamp"]),
+            dtype=np.int64, count=len(columns["timestamp"]),
+        )
+        days = list(interned)
+        order = sorted(range(len(days)), key=days.__getitem__)
+        remap = np.empty(len(days), dtype=np.int64)
+        remap[order] = np.arange(len(days))
+        self.day_table = [days[i] for i in order]
+        if self.day_table and self.day_table[0] == "":
+            self.day_table.pop(0)
+            remap -= 1
+        self.day_ordinals = remap[day_codes]
+
+        # Corrections aplaties + bornes de chaque tour ("" final: tours sans correction)
+        per_turn = columns["corrections"]
+        lengths = np.fromiter(map(len, per_turn), dtype=np.int64, count=len(per_turn))
+        flat = np.array(list(chain.from_iterable(per_turn)) + [""], dtype=object)
+        firsts = flat[np.cumsum(lengths) - lengths]
+        self.correction_free = (lengths == 0) | ((lengths == 1) & (firsts == _NO_CORRECTION))
+
+        # Tables internées (ordre de première apparition, comme Counter et SQLite)
+        errors = Counter(chain.from_iterable(per_turn))
+        for text in [text for text in errors if text == _NO_CORRECTION or not text.strip()]:
+            del errors[text]
+        self.error_table = list(errors)
+        self.error_counts = np.fromiter(errors.values(), dtype=np.int64, count=len(errors))
+        self.vocabulary_table = _distinct(columns["vocabulary"])
+        self.grammar_tip_table = _distinct(columns["grammar_tips"])
+
+    @classmethod
+    def from_turns(cls, turns):
+        return cls(turns)
+
+    # --- Interface de requêtes (mêmes noms que SQLiteStore) ---
+
+    def count(self):
+        return int(len(self.user_words))
+
+    def total_words_spoken(self):
+        return int(self.user_words.sum())
+
+    def total_words_heard(self):
+        return int(self.ai_words.sum())
+
+    def correction_free_turns(self):
+        return int(self.correction_free.sum())
+
+    def recurring_errors(self, top_n=5):
+        # Tri stable par fréquence décroissante: égalités dans l'ordre d'apparition
+        order = np.argsort(-self.error_counts, kind="stable")[:top_n]
+        return [(self.error_table[i], int(self.error_counts[i])) for i in order]
+
+    def distinct_texts(self, table):
+        if table == "vocabulary":
+            return set(self.vocabulary_table)
+        if table == "grammar_tips":
+            return set(self.grammar_tip_table)
+        raise ValueError(f"Unknown table: {table}")
+
+    def daily_progress(self, start=None, end=None, granularity="day"):
+        has_day = self.day_ordinals >= 0
+        codes = self.day_ordinals[has_day]
+        size = len(self.day_table)
+        turns = np.bincount(codes, minlength=size)
+        words = np.bincount(codes, weights=self.user_words[has_day], minlength=size)
+        # Table des jours triée: la période est un intervalle d'ordinaux
+        lo, hi = sorted_range(self.day_table, to_day(start), to_day(end))
+        daily = [
+            (self.day_table[i], {"turns": int(turns[i]), "words": int(words[i])})
+            for i in range(lo, hi)
+        ]
+        if granularity == "day":
+            return dict(daily)
+        return group_daily(daily, granularity)
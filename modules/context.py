@@ -0,0 +1,102 @@
+import threading
+from config import CONTEXT_TOKEN_BUDGET, CONTEXT_KEEP_TURNS
+from modules.llm_client import summarize_conversation
+from modules.tokens import count_message_tokens
+
+
+class ContextWindow:
+    """
+    Limite la taille des requêtes envoyées au LLM:
+    - le prompt système et les CONTEXT_KEEP_TURNS derniers échanges sont envoyés tels quels;
+    - les messages plus anciens sont résumés par le LLM dans un thread en
+      arrière-plan, puis retirés de l'historique (qui ne grossit plus); tant
+      que le résumé n'est pas appliqué, ils sont encore envoyés tels quels
+      (aucun tour ne perd de contexte, le budget est dépassé le temps d'un résumé);
+    - si le total dépasse CONTEXT_TOKEN_BUDGET, les échanges récents les plus
+      anciens passent aussi dans le résumé.
+    Une instance par conversation (CLI: une variable, Streamlit: session_state);
+    appeler reset() quand l'historique est remplacé (Reset, changement de mode).
+    """
+
+    def __init__(self, token_budget=CONTEXT_TOKEN_BUDGET, keep_turns=CONTEXT_KEEP_TURNS,
+                 summarize=summarize_conversation):
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.summarize = summarize
+        self.summary = ""
+        self._folded = 0          # messages résumés, à retirer de l'historique
+        self._pending = None      # thread de résumé en cours
+        self._generation = 0      # incrémenté par reset(): résumés en cours ignorés
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """
+        Oublie le résumé et les messages à retirer (nouvelle conversation).
+        """
+        with self._lock:
+            self._generation += 1
+            self.summary = ""
+            self._folded = 0
+            self._pending = None
+
+    def _system_message(self, system):
+        if not self.summary:
+            return system
+        return {
+            "role": "system",
+            "content": f"{system['content']}\n\nSummary of the earlier conversation:\n{self.summary}",
+        }
+
+    def prepare(self, history):
+        """
+        Retourne les messages à envoyer pour cet historique
+        ([système, ...messages, dernier message de l'élève]).
+        Retire de l'historique les messages déjà intégrés au résumé et lance
+        le résumé des suivants si l'historique dépasse la fenêtre.
+        """
+        with self._lock:
+            if self._folded:
+                del history[1:1 + self._folded]
+                self._folded = 0
+            system = self._system_message(history[0])
+            pending = self._pending is not None and self._pending.is_alive()
+
+        turns = history[1:]
+        keep = 2 * self.keep_turns + 1
+        recent, older = turns[-keep:], turns[:-keep]
+
+        # Budget: les échanges récents les plus anciens passent dans le résumé
+        budget = self.token_budget - count_message_tokens([system])
+        while len(recent) > 1 and count_message_tokens(recent) > budget:
+            older = older + recent[:2]
+            recent = recent[2:]
+
+        if not older:
+            return [system] + recent
+        if not pending:
+            self._start_summary(list(older))
+        # Pas encore résumés: envoyés tels quels jusqu'à l'application du résumé
+        return [system] + turns
+
+    def _start_summary(self, messages):
+        """
+        Résume `messages` (les plus anciens de l'historique) en arrière-plan.
+        """
+        previous = self.summary
+        generation = self._generation
+
+        def run():
+            try:
+                summary = self.summarize(previous, messages)
+            except Exception as e:
+                print(f"❌ Summary error: {e}")
+                return
+            with self._lock:
+                if self._generation == generation and summary:
+                    self.summary = summary
+                    self._folded = len(messages)
+
+        thread = threading.Thread(target=run, name="context-summary", daemon=True)
+        with self._lock:
+            self._pending = thread
+        thread.start()
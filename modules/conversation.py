@@ -1,35 +1,78 @@
-import json
-import os
 from datetime import datetime
+from config import CONVERSATIONS_FILE, LEARNERS_DIR, DEFAULT_LEARNER, WRITE_BEHIND, WRITE_FSYNC
+from modules.storage import open_store, new_session_id, ShardedStore
+from modules.aggregates import aggregates_filename, load_aggregates, load_total_aggregates
+from modules.writer import get_writer, flush_all
 
 
 class ConversationManager:
     """
-    Gère l'historique des conversations et les sauvegarde en JSON.
+    Gère l'historique des conversations et les sauvegarde via un backend
+    de stockage (voir modules/storage.py):
+    - .jsonl: chaque tour est ajouté en fin de journal (une ligne JSON)
+    - .json: ancien format, tout l'historique est réécrit à chaque tour
+    - .db: base SQLite, chaque tour est inséré (les totaux sont calculés en SQL)
+    Avec un learner_id, chaque session écrit dans son propre journal
+    (data/learners/<apprenant>/<session>.jsonl), sans conflit entre sessions.
+    Avec write_behind, les tours sont écrits par un thread en arrière-plan
+    (voir modules/writer.py) et add_turn retourne sans attendre le disque.
     """
     
-    def __init__(self, filename="data/conversations.json"):
+    def __init__(self, filename=CONVERSATIONS_FILE, journal=None, learner_id=None, session_id=None,
+                 write_behind=WRITE_BEHIND):
         """
         Initialise le gestionnaire de conversations.
         """
-        self.filename = filename
+        self.write_behind = write_behind
+        self.learner_id = learner_id
+        self.session_id = session_id or new_session_id()
         self.session_history = []  # Historique de la session actuelle
-        self.all_history = []      # Toutes les conversations (anciennes + nouvelles)
+        self.all_history = []      # Toutes les conversations (ancien format .json uniquement)
+        self.previous_count = 0    # Nombre de tours déjà sauvegardés avant cette session
         
-        # Créer le dossier data/ s'il n'existe pas
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        # Ouvrir le backend (crée le dossier data/ et migre l'ancien fichier si besoin)
+        if learner_id is not None:
+            # L'ancien fichier unique est repris par l'apprenant par défaut
+            legacy_file = filename if learner_id == DEFAULT_LEARNER else None
+            self.store = ShardedStore(LEARNERS_DIR, learner_id, self.session_id, legacy_file=legacy_file)
+            # Fichier de cette session (les agrégats sont tenus par session)
+            self._stats_store = self.store.shard
+        else:
+            self.store = open_store(filename, journal=journal)
+            self._stats_store = self.store
+        self.filename = self._stats_store.filename
+        self.journal = getattr(self.store, "journal", False)
         
         # Charger les conversations existantes
         self._load_existing()
+        
+        # Statistiques de progression maintenues à chaque tour
+        # (SQLite: calculées en SQL, pas de fichier d'agrégats)
+        self.aggregates = None
+        if not self._stats_store.supports_queries:
+            try:
+                self.aggregates = load_aggregates(self._stats_store)
+            except Exception as e:
+                print(f"❌ Error loading progress aggregates: {e}")
     
     def _load_existing(self):
         """
         Charge les conversations existantes depuis le fichier.
+        En mode journal ou SQLite, l'historique reste sur disque: seul le
+        nombre de tours est lu (requête SQL, ou agrégats persistés des
+        journaux et manifestes de l'archive).
         """
         try:
-            if os.path.exists(self.filename):
-                with open(self.filename, 'r', encoding='utf-8') as f:
-                    self.all_history = json.load(f)
+            if self.store.append_only:
+                self.all_history = []
+                if self.store.supports_queries:
+                    self.previous_count = self.store.count()
+                else:
+                    self.previous_count = load_total_aggregates(self.store).count()
+                print(f"📂 Loaded {self.previous_count} previous conversations")
+            elif self.store.exists():
+                self.all_history = self.store.load_all()
+                self.previous_count = len(self.all_history)
                 print(f"📂 Loaded {len(self.all_history)} previous conversations")
         except Exception as e:
             print(f"❌ Error loading conversations: {e}")
@@ -50,28 +93,72 @@ class ConversationManager:
         }
         
         self.session_history.append(turn)
-        self.all_history.append(turn)
+        if not self.store.append_only:
+            self.all_history.append(turn)
         
-        # Auto-save après chaque tour
-        self._auto_save()
+        # Auto-save après chaque tour (différé ou immédiat)
+        if self.write_behind:
+            get_writer().submit(self, turn)
+        else:
+            self._write_batch([turn])
     
-    def _auto_save(self):
+    def _write_batch(self, turns):
         """
-        Sauvegarde automatique après chaque tour.
+        Sauvegarde un lot de tours (appelé par le thread d'écriture).
+        En mode journal ou SQLite, seuls les nouveaux tours sont écrits, en une
+        seule écriture (coût indépendant de la taille de l'historique).
         """
+        maintain_aggregates = not self._stats_store.supports_queries
+        version_before = self._stats_store.version() if maintain_aggregates else None
         try:
-            with open(self.filename, 'w', encoding='utf-8') as f:
-                json.dump(self.all_history, f, indent=2, ensure_ascii=False)
+            if self.store.append_only:
+                self.store.append_many(turns, fsync=WRITE_FSYNC == "commit")
+            else:
+                self.store.save_all(list(self.all_history))
         except Exception as e:
             print(f"❌ Auto-save error: {e}")
+            return
+        if maintain_aggregates:
+            self._update_aggregates(turns, version_before)
+    
+    def _update_aggregates(self, turns, version_before):
+        """
+        Met à jour les agrégats de progression en O(1) par tour et les persiste.
+        Si le stockage a été modifié par ailleurs depuis la dernière mise à jour,
+        les agrégats sont reconstruits depuis l'historique.
+        """
+        try:
+            if self.aggregates is None or self.aggregates.source_version != version_before:
+                self.aggregates = load_aggregates(self._stats_store)
+                return
+            for turn in turns:
+                self.aggregates.add_turn(turn)
+            self._save_aggregates()
+        except Exception as e:
+            print(f"❌ Error updating progress aggregates: {e}")
+    
+    def _save_aggregates(self):
+        """
+        Associe les agrégats à la version actuelle du stockage et les sauvegarde.
+        """
+        self.aggregates.source_version = self._stats_store.version()
+        self.aggregates.save(aggregates_filename(self.filename))
     
     def save(self):
         """
         Sauvegarde manuelle l'historique dans le fichier JSON.
         """
+        # Écrire d'abord les tours encore en attente dans le thread d'écriture
+        flush_all()
         try:
-            with open(self.filename, 'w', encoding='utf-8') as f:
-                json.dump(self.all_history, f, indent=2, ensure_ascii=False)
+            if not self.store.supports_queries:
+                if self.store.append_only:
+                    # Journal: réécriture en flux (supprime d'éventuelles lignes tronquées)
+                    self.store.compact()
+                else:
+                    self.store.save_all(self.all_history)
+                if self.aggregates is not None:
+                    self._save_aggregates()
             print(f"\n💾 Conversation saved to {self.filename}")
         except Exception as e:
             print(f"\n❌ Error saving conversation: {e}")
@@ -92,4 +179,6 @@ class ConversationManager:
         """
         Retourne le nombre total de tous les tours.
         """
+        if self.store.append_only:
+            return self.previous_count + len(self.session_history)
         return len(self.all_history)
@@ -47,3 +47,33 @@ def extract_feedback(llm_response):
     sections["response"] = sections["response"].strip()
     
     return sections
+
+
+# Marqueurs qui ouvrent les sections de feedback dans la réponse de l'IA
+FEEDBACK_MARKERS = (
+    "**Corrections:**", "**Correction:**",
+    "**Vocabulary:**", "**Vocab:**",
+    "**Grammar Tip:**", "**Grammar:**",
+)
+
+
+def response_part(partial_text):
+    """
+    Partie conversationnelle d'une réponse en cours de réception: le texte
+    avant la première section de feedback, sans un marqueur encore incomplet
+    en fin de texte (ex: "**Vocab").
+    """
+    cut = len(partial_text)
+    for marker in FEEDBACK_MARKERS:
+        index = partial_text.find(marker)
+        if index != -1:
+            cut = min(cut, index)
+
+    longest = max(len(marker) for marker in FEEDBACK_MARKERS)
+    for i in range(max(0, cut - longest), cut):
+        tail = partial_text[i:cut]
+        if tail.startswith("*") and any(marker.startswith(tail) for marker in FEEDBACK_MARKERS):
+            cut = i
+            break
+
+    return partial_text[:cut].strip()
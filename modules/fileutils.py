@@ -0,0 +1,55 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def temp_path_for(filename):
+    """
+    Chemin temporaire unique (processus + thread) pour une écriture atomique:
+    deux écrivains ne partagent jamais le même fichier temporaire.
+    """
+    return f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+@contextmanager
+def file_lock(filename):
+    """
+    Verrou exclusif inter-processus sur `<filename>.lock` (flock / msvcrt).
+    """
+    with open(filename + ".lock", 'a+b') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write_bytes(filename, data):
+    """
+    Écrit un fichier en entier (fichier temporaire synchronisé puis renommage):
+    après un crash, on retrouve soit l'ancien contenu, soit le nouveau complet.
+    """
+    temp_path = temp_path_for(filename)
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, filename)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
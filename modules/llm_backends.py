@@ -0,0 +1,115 @@
+import json
+from types import SimpleNamespace
+from config import GROQ_API_KEY, LLM_BACKEND, LLM_LOCAL_URL
+from modules.resilience import LLMError
+
+
+# Backends disponibles (config.LLM_BACKEND)
+BACKENDS = ("groq", "local")
+
+
+def _status_error(status, text):
+    """
+    Convertit une réponse HTTP en échec en LLMError (mêmes catégories que classify_error).
+    """
+    message = f"HTTP {status}: {text[:200]}"
+    if status == 429:
+        return LLMError("rate_limited", message, retryable=True)
+    if status >= 500:
+        return LLMError("unavailable", message, retryable=True)
+    if status in (401, 403):
+        return LLMError("auth", message)
+    return LLMError("bad_request", message)
+
+
+def _transport_error(error):
+    import httpx
+    if isinstance(error, httpx.TimeoutException):
+        return LLMError("timeout", str(error) or "Request timed out", retryable=True)
+    return LLMError("unavailable", f"{type(error).__name__}: {error}", retryable=True)
+
+
+class _Completions:
+    """
+    Équivalent de client.chat.completions pour une API compatible OpenAI:
+    POST {base_url}/chat/completions, flux en Server-Sent Events.
+    Les réponses ont la même forme que celles du SDK Groq
+    (choices[0].message.content, choices[0].delta.content).
+    """
+
+    def __init__(self, base_url, api_key, http_client):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.headers = {"Authorization": f"Bearer {api_key or 'local'}"}
+        self.http = http_client
+
+    async def create(self, model, messages, max_tokens=None, temperature=None, stream=False):
+        import httpx
+        payload = {"model": model, "messages": messages, "stream": stream}
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+        if temperature is not None:
+            payload["temperature"] = temperature
+        request = self.http.build_request("POST", self.url, json=payload, headers=self.headers)
+        try:
+            response = await self.http.send(request, stream=stream)
+            if response.status_code >= 400:
+                body = (await response.aread()).decode('utf-8', 'replace')
+                await response.aclose()
+                raise _status_error(response.status_code, body)
+        except httpx.HTTPError as e:
+            raise _transport_error(e)
+
+        if not stream:
+            data = response.json()
+            return SimpleNamespace(choices=[
+                SimpleNamespace(message=SimpleNamespace(content=choice["message"].get("content")))
+                for choice in data.get("choices", [])
+            ])
+        return self._events(response)
+
+    async def _events(self, response):
+        """
+        Itère sur les morceaux d'une réponse en flux (lignes « data: {...} »).
+        """
+        import httpx
+        try:
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                event = json.loads(data)
+                yield SimpleNamespace(choices=[
+                    SimpleNamespace(delta=SimpleNamespace(content=choice.get("delta", {}).get("content")))
+                    for choice in event.get("choices", [])
+                ])
+        except httpx.HTTPError as e:
+            raise _transport_error(e)
+        finally:
+            await response.aclose()
+
+
+class OpenAICompatibleClient:
+    """
+    Client minimal pour un serveur compatible OpenAI (chat completions
+    uniquement), utilisable à la place d'AsyncGroq par LLMService.
+    """
+
+    def __init__(self, base_url, api_key, http_client):
+        self.chat = SimpleNamespace(completions=_Completions(base_url, api_key, http_client))
+
+
+def create_client(backend=LLM_BACKEND, api_key=GROQ_API_KEY, http_client=None, base_url=None):
+    """
+    Crée le client asynchrone d'un backend (voir BACKENDS).
+    Les nouvelles tentatives sont gérées par LLMService: le client n'en fait pas.
+    Le SDK Groq et httpx ne sont importés qu'ici (démarrage rapide de l'application).
+    """
+    import httpx
+    if backend == "groq":
+        from groq import AsyncGroq
+        return AsyncGroq(api_key=api_key, http_client=http_client, max_retries=0, base_url=base_url)
+    if backend == "local":
+        return OpenAICompatibleClient(base_url or LLM_LOCAL_URL, api_key, http_client or httpx.AsyncClient())
+    raise ValueError(f"Unknown LLM backend: {backend} (expected one of {BACKENDS})")
@@ -1,7 +1,5 @@
-from groq import Groq
-from config import GROQ_API_KEY
-
-client = Groq(api_key=GROQ_API_KEY)
+from modules.llm_service import get_llm_service
+from modules.resilience import LLMError
 
 # Modes d'apprentissage disponibles
 LEARNING_MODES = {
@@ -136,9 +134,9 @@ Respond in English and help the user practice.
     return system_prompt
 
 
-def ask_llm(history, user_text, role="tutor", learning_mode="general"):
+def _prepare_history(history, user_text, role, learning_mode):
     """
-    Appelle l'IA Groq pour générer une réponse.
+    Met à jour le prompt système et ajoute le message de l'utilisateur.
     """
     system_prompt = get_system_prompt(role, learning_mode)
 
@@ -148,22 +146,84 @@ def ask_llm(history, user_text, role="tutor", learning_mode="general"):
         history[0]["content"] = system_prompt
 
     history.append({"role": "user", "content": user_text})
+    return history
 
-    try:
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=history,
-            max_tokens=500,
-            temperature=0.7,
-        )
 
-        assistant_message = response.choices[0].message.content
+def ask_llm(history, user_text, role="tutor", learning_mode="general", context=None):
+    """
+    Appelle l'IA Groq pour générer une réponse.
+    Avec un ContextWindow (modules/context.py), seuls le prompt système, le
+    résumé et les derniers échanges sont envoyés.
+    
+    Raises:
+        LLMError: appel en échec (le message de l'élève est retiré de l'historique)
+    """
+    history = _prepare_history(history, user_text, role, learning_mode)
+    messages = context.prepare(history) if context is not None else history
+
+    try:
+        assistant_message = get_llm_service().chat_sync(messages, max_tokens=500, temperature=0.7)
 
         history.append({"role": "assistant", "content": assistant_message})
 
         return assistant_message, history
 
-    except Exception as e:
-        error_message = f"Error calling Groq API: {e}"
-        print(f"❌ {error_message}")
-        return error_message, history
+    except LLMError as e:
+        print(f"❌ Error calling Groq API ({e.kind}): {e}")
+        history.pop()
+        raise
+
+
+def ask_llm_stream(history, user_text, role="tutor", learning_mode="general", context=None):
+    """
+    Variante en streaming de ask_llm: la réponse arrive morceau par morceau.
+    
+    Returns:
+        tuple: (chunks, history) où chunks est un générateur de morceaux de texte.
+               Le message complet est ajouté à history une fois le flux terminé.
+               L'itération lève LLMError si l'appel échoue (le message de
+               l'élève est alors retiré de l'historique).
+    """
+    history = _prepare_history(history, user_text, role, learning_mode)
+    messages = context.prepare(history) if context is not None else history
+
+    def chunks():
+        parts = []
+        try:
+            for content in get_llm_service().stream_sync(messages, max_tokens=500, temperature=0.7):
+                parts.append(content)
+                yield content
+        except LLMError as e:
+            print(f"❌ Error calling Groq API ({e.kind}): {e}")
+            history.pop()
+            raise
+
+        # Seul le message final est gardé dans l'historique
+        history.append({"role": "assistant", "content": "".join(parts)})
+
+    return chunks(), history
+
+
+def summarize_conversation(previous_summary, messages):
+    """
+    Résume des messages anciens de la conversation (en complétant le résumé précédent).
+    Utilisé en arrière-plan par ContextWindow.
+    """
+    transcript = "\n".join(
+        f"{'Student' if m['role'] == 'user' else 'Tutor'}: {m['content']}" for m in messages
+    )
+    prompt = f"""Summarize this English practice conversation in 5 sentences or less.
+Keep the topics discussed, facts about the student and their recurring mistakes.
+
+Previous summary:
+{previous_summary or "(none)"}
+
+New messages:
+{transcript}
+
+Updated summary:"""
+
+    summary = get_llm_service().chat_sync(
+        [{"role": "user", "content": prompt}], max_tokens=300, temperature=0.3, priority="summary"
+    )
+    return summary.strip()
@@ -0,0 +1,287 @@
+import asyncio
+import queue
+import threading
+import time
+from config import (
+    GROQ_API_KEY, LLM_BACKEND, LLM_MODEL, LLM_MAX_CONCURRENCY, LLM_MAX_CONNECTIONS,
+    LLM_KEEPALIVE_EXPIRY, LLM_TIMEOUT, LLM_CONNECT_TIMEOUT,
+    LLM_DEADLINE, LLM_MAX_RETRIES, LLM_HEDGE,
+)
+from modules.llm_backends import create_client
+from modules.resilience import LLMError, classify_error, backoff_delay, Deadline, LatencyTracker, CircuitBreaker
+from modules.scheduler import RequestScheduler
+from modules.tokens import count_tokens, count_message_tokens
+
+
+class LLMService:
+    """
+    Client LLM partagé par tout le processus (llm_client, translator, résumés):
+    un client unique (Groq ou serveur compatible OpenAI, voir
+    modules/llm_backends.py) sur un pool de connexions HTTP keep-alive,
+    exécuté dans une boucle asyncio dédiée (thread en arrière-plan).
+    Les requêtes passent par un ordonnanceur (modules/scheduler.py): budget
+    de requêtes/tokens par minute partagé, priorités et contrôle d'admission.
+    L'API est asynchrone (chat, chat_stream); chat_sync et stream_sync
+    permettent de l'appeler depuis le script Streamlit ou la CLI.
+    Chaque appel a une échéance (deadline), les erreurs temporaires sont
+    relancées avec backoff exponentiel + jitter, une requête lente est
+    doublée au p95 (hedging) et un disjoncteur échoue immédiatement pendant
+    une panne. Les échecs sont levés en LLMError (modules/resilience.py).
+    """
+
+    def __init__(self, api_key=GROQ_API_KEY, max_concurrency=LLM_MAX_CONCURRENCY,
+                 max_connections=LLM_MAX_CONNECTIONS, timeout=LLM_TIMEOUT,
+                 connect_timeout=LLM_CONNECT_TIMEOUT, client=None,
+                 backend=LLM_BACKEND, base_url=None, scheduler=None):
+        self.api_key = api_key
+        self.backend = backend
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.client = client
+        self.latency = LatencyTracker()
+        self.breaker = CircuitBreaker()
+        self.scheduler = scheduler or RequestScheduler(max_concurrency)
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="llm-loop", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        # Objets liés à la boucle: créés dans son thread
+        if self.client is None:
+            import httpx  # import différé: chargé au premier appel LLM, pas au démarrage
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            )
+            # Les nouvelles tentatives sont gérées ici (deadline, jitter, disjoncteur)
+            self.client = create_client(self.backend, self.api_key, http_client, self.base_url)
+        self._ready.set()
+        self._loop.run_forever()
+
+    # --- API asynchrone (à appeler dans la boucle du service) ---
+
+    async def _request(self, messages, model, max_tokens, temperature, priority, deadline):
+        """
+        Une requête (sans nouvelle tentative), servie par l'ordonnanceur;
+        l'échéance démarre à l'admission. Enregistre sa latence (hors
+        attente en file) si elle réussit.
+        """
+        prompt_tokens = count_message_tokens(messages)
+        async with self.scheduler.slot(priority, prompt_tokens + max_tokens) as ticket:
+            deadline.start()
+            start = time.monotonic()
+            response = await asyncio.wait_for(self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            ), deadline.remaining())
+            self.latency.record(time.monotonic() - start)
+            content = response.choices[0].message.content
+            ticket.used = prompt_tokens + count_tokens(content or "")
+        return content
+
+    async def _hedged_request(self, *args):
+        """
+        Lance une 2e requête identique si la 1re n'a pas répondu au p95
+        des latences observées; retourne la première réponse réussie.
+        """
+        hedge_after = self.latency.percentile(0.95)
+        tasks = {asyncio.ensure_future(self._request(*args))}
+        error = None
+        try:
+            if hedge_after is not None:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done:
+                    tasks.add(asyncio.ensure_future(self._request(*args)))
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            # Réponse obtenue, échec ou appel annulé (échéance): les requêtes
+            # restantes sont annulées et rendent leur place dans l'ordonnanceur
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _with_retries(self, attempt_call, deadline):
+        """
+        Exécute attempt_call() jusqu'au succès, en relançant les erreurs
+        temporaires tant que l'échéance (Deadline) n'est pas atteinte.
+        """
+        trial = self.breaker.check()
+        attempt = 0
+        while True:
+            try:
+                result = await attempt_call()
+            except Exception as e:
+                error = classify_error(e)
+            except BaseException:
+                # Appel annulé: l'essai du disjoncteur ne dit rien du service
+                if trial:
+                    self.breaker.record_neutral()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+            # Requête refusée ou rejetée: le service lui-même n'est pas en panne
+            if error.kind in ("bad_request", "overloaded"):
+                if trial:
+                    self.breaker.record_neutral()
+            else:
+                self.breaker.record_failure()
+
+            delay = backoff_delay(attempt)
+            if not error.retryable or attempt >= LLM_MAX_RETRIES or delay >= deadline.remaining():
+                raise error
+            await asyncio.sleep(delay)
+            attempt += 1
+            trial = self.breaker.check()
+
+    async def chat(self, messages, model=LLM_MODEL, max_tokens=500, temperature=0.7,
+                   deadline=LLM_DEADLINE, hedge=LLM_HEDGE, priority="live"):
+        """
+        Retourne le texte complet de la réponse.
+        `priority`: classe de la requête pour l'ordonnanceur
+        ("live", "summary", "translation" ou "batch").
+        `deadline`: secondes à partir de l'admission par l'ordonnanceur.
+
+        Raises:
+            LLMError: échéance dépassée, erreur non temporaire, disjoncteur
+                      ouvert, file d'attente pleine ou attente trop longue
+                      ("overloaded")
+        """
+        deadline = Deadline(deadline)
+        args = (messages, model, max_tokens, temperature, priority, deadline)
+        request = self._hedged_request if hedge else self._request
+        return await self._with_retries(lambda: request(*args), deadline)
+
+    async def chat_stream(self, messages, model=LLM_MODEL, max_tokens=500, temperature=0.7,
+                          deadline=LLM_DEADLINE, priority="live"):
+        """
+        Générateur asynchrone des morceaux de texte de la réponse.
+        Les nouvelles tentatives ne sont possibles qu'avant le premier morceau
+        (pas de hedging: deux flux ne peuvent pas être fusionnés).
+
+        Raises:
+            LLMError: comme chat, ou coupure du flux après le premier morceau
+        """
+        deadline = Deadline(deadline)
+
+        async def open_stream():
+            # Connexion + premier morceau non vide
+            stream = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+            )
+            chunks = stream.__aiter__()
+            async for chunk in chunks:
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    return content, chunks
+            return None, None  # réponse vide
+
+        prompt_tokens = count_message_tokens(messages)
+        ticket = self.scheduler.slot(priority, prompt_tokens + max_tokens)
+        # Attente en file bornée par l'ordonnanceur (LLM_QUEUE_TIMEOUTS)
+        await self.scheduler.acquire(ticket)
+        deadline.start()
+
+        received = []
+        try:
+            first, chunks = await self._with_retries(
+                lambda: asyncio.wait_for(open_stream(), deadline.remaining()), deadline
+            )
+            if first is None:
+                return
+            received.append(first)
+            yield first
+            try:
+                while True:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), deadline.remaining())
+                    content = chunk.choices[0].delta.content if chunk.choices else None
+                    if content:
+                        received.append(content)
+                        yield content
+            except StopAsyncIteration:
+                pass
+            except Exception as e:
+                raise classify_error(e)
+        finally:
+            ticket.used = prompt_tokens + count_tokens("".join(received))
+            self.scheduler.release(ticket)
+
+    # --- Ponts synchrones ---
+
+    def submit(self, coroutine):
+        """
+        Exécute une coroutine dans la boucle du service (concurrent.futures.Future).
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def chat_sync(self, messages, **kwargs):
+        """
+        Version bloquante de chat (pour le script Streamlit et la CLI).
+        """
+        return self.submit(self.chat(messages, **kwargs)).result()
+
+    def stream_sync(self, messages, **kwargs):
+        """
+        Version bloquante de chat_stream: itère sur les morceaux dans le thread appelant.
+        """
+        items = queue.Queue()
+        done = object()
+
+        async def pump():
+            try:
+                async for content in self.chat_stream(messages, **kwargs):
+                    items.put(content)
+            except Exception as e:
+                items.put(classify_error(e))
+            finally:
+                items.put(done)
+
+        future = self.submit(pump())
+        try:
+            while True:
+                item = items.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Lecture interrompue: libérer la connexion
+            future.cancel()
+
+
+# Instance globale (partagée par toutes les sessions du processus)
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_llm_service():
+    """Retourne le client LLM partagé (créé au premier appel)."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = LLMService()
+        return _service
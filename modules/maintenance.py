@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from config import LEARNERS_DIR, ARCHIVE_AFTER_DAYS, ARCHIVE_SEGMENT_TURNS, ARCHIVE_INTERVAL
+from modules.aggregates import aggregates_filename
+from modules.fileutils import file_lock
+from modules.storage import ShardedStore, learner_directories, ALL_LEARNERS
+
+
+def _archive_journal(journal, archive, cutoff, remove_empty):
+    """
+    Déplace les tours d'un journal antérieurs à `cutoff` dans l'archive.
+    Le segment est écrit avant la réécriture du journal: après un crash
+    entre les deux, les tours déjà archivés (timestamp <= archived_until)
+    sont seulement retirés du journal au passage suivant.
+    Le fichier .lock d'un journal vidé est conservé: le supprimer laisserait
+    deux processus verrouiller des inodes différents pour le même journal.
+    """
+    source = os.path.basename(journal.filename)
+    moved = 0
+    with file_lock(journal.filename):
+        archived_until = archive.archived_until(source)
+        batch = []
+        found = False
+        for turn in journal.iter_turns(include_archive=False):
+            timestamp = turn.get("timestamp", "")
+            already_archived = archived_until is not None and timestamp <= archived_until
+            # Journal chronologique: le reste est récent
+            if timestamp >= cutoff and not already_archived:
+                break
+            found = True
+            if already_archived:
+                continue
+            batch.append(turn)
+            if len(batch) >= ARCHIVE_SEGMENT_TURNS:
+                archive.add_segment(batch, source)
+                moved += len(batch)
+                batch = []
+        if batch:
+            archive.add_segment(batch, source)
+            moved += len(batch)
+
+        if not found:
+            return 0
+        archived_until = archive.archived_until(source)
+        journal.retain(lambda turn: turn.get("timestamp", "") > archived_until)
+        empty = os.path.getsize(journal.filename) == 0
+        if empty and remove_empty:
+            os.remove(journal.filename)
+            stats_file = aggregates_filename(journal.filename)
+            if os.path.exists(stats_file):
+                os.remove(stats_file)
+    return moved
+
+
+def archive_old_turns(store, older_than_days=ARCHIVE_AFTER_DAYS):
+    """
+    Déplace les tours de plus de `older_than_days` jours des journaux d'un
+    stockage vers son archive de segments compressés.
+    Les journaux de session vidés sont supprimés (stockage partitionné).
+
+    Returns:
+        int: Nombre de tours archivés
+    """
+    if getattr(store, "archive", None) is None:
+        return 0
+    cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+    remove_empty = isinstance(store, ShardedStore)
+    return sum(
+        _archive_journal(journal, store.archive, cutoff, remove_empty)
+        for journal in store.journals()
+    )
+
+
+def run_maintenance(root=LEARNERS_DIR, older_than_days=ARCHIVE_AFTER_DAYS):
+    """
+    Une passe d'archivage puis de compaction pour chaque apprenant.
+    """
+    for directory in learner_directories(root, ALL_LEARNERS):
+        learner_id = os.path.basename(directory)
+        try:
+            store = ShardedStore(root, learner_id)
+            moved = archive_old_turns(store, older_than_days)
+            merged = store.archive.compact()
+            if moved or merged:
+                print(f"📦 Archived {moved} turns for learner '{learner_id}' ({merged} segments compacted)")
+        except Exception as e:
+            print(f"❌ Archive error for learner '{learner_id}': {e}")
+
+
+# Thread d'archivage (un seul par processus)
+_maintenance_thread = None
+_maintenance_lock = threading.Lock()
+
+
+def start_background_maintenance(root=LEARNERS_DIR, interval=ARCHIVE_INTERVAL):
+    """
+    Lance l'archivage/compaction périodique dans un thread en arrière-plan
+    (sans effet si le thread tourne déjà).
+    """
+    global _maintenance_thread
+
+    def loop():
+        while True:
+            run_maintenance(root)
+            time.sleep(interval)
+
+    with _maintenance_lock:
+        if _maintenance_thread is None or not _maintenance_thread.is_alive():
+            _maintenance_thread = threading.Thread(target=loop, name="archive-maintenance", daemon=True)
+            _maintenance_thread.start()
@@ -0,0 +1,191 @@
+import asyncio
+import random
+import sys
+import threading
+import time
+from collections import deque
+from config import (
+    LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY, LLM_HEDGE_MIN_SAMPLES,
+    LLM_BREAKER_THRESHOLD, LLM_BREAKER_COOLDOWN,
+)
+
+
+class LLMError(Exception):
+    """
+    Erreur structurée d'un appel LLM (au lieu d'un texte d'erreur renvoyé
+    comme une réponse).
+
+    Attributs:
+        kind: "timeout", "rate_limited", "unavailable", "circuit_open",
+              "overloaded", "auth", "bad_request" ou "error"
+        retryable: True si une nouvelle tentative peut réussir
+    """
+
+    # Messages affichés à l'élève
+    USER_MESSAGES = {
+        "timeout": "The tutor took too long to answer. Please try again.",
+        "rate_limited": "Too many requests right now. Please wait a moment.",
+        "unavailable": "The AI service is unreachable. Check your connection.",
+        "circuit_open": "The AI service is currently down. Retrying shortly.",
+        "auth": "Invalid Groq API key (check GROQ_API_KEY in .env).",
+        "bad_request": "The request was rejected by the AI service.",
+        "overloaded": "The tutor is very busy right now. Please try again in a moment.",
+        "error": "Unexpected error from the AI service.",
+    }
+
+    def __init__(self, kind, message, retryable=False):
+        super().__init__(message)
+        self.kind = kind
+        self.retryable = retryable
+
+    @property
+    def user_message(self):
+        return self.USER_MESSAGES.get(self.kind, self.USER_MESSAGES["error"])
+
+
+def classify_error(error):
+    """
+    Convertit une exception (groq, asyncio) en LLMError.
+    """
+    if isinstance(error, LLMError):
+        return error
+    if isinstance(error, asyncio.TimeoutError):
+        return LLMError("timeout", str(error) or "Request timed out", retryable=True)
+    # Le SDK Groq n'est importé que par son backend: s'il n'est pas chargé,
+    # l'erreur ne peut pas venir de lui
+    groq = sys.modules.get("groq")
+    if groq is None:
+        return LLMError("error", f"{type(error).__name__}: {error}")
+    if isinstance(error, groq.APITimeoutError):
+        return LLMError("timeout", str(error) or "Request timed out", retryable=True)
+    if isinstance(error, groq.APIConnectionError):
+        return LLMError("unavailable", str(error), retryable=True)
+    if isinstance(error, groq.RateLimitError):
+        return LLMError("rate_limited", str(error), retryable=True)
+    if isinstance(error, groq.InternalServerError):
+        return LLMError("unavailable", str(error), retryable=True)
+    if isinstance(error, (groq.AuthenticationError, groq.PermissionDeniedError)):
+        return LLMError("auth", str(error))
+    if isinstance(error, groq.APIStatusError):
+        return LLMError("bad_request", str(error))
+    return LLMError("error", f"{type(error).__name__}: {error}")
+
+
+def backoff_delay(attempt, base=LLM_RETRY_BASE_DELAY, cap=LLM_RETRY_MAX_DELAY):
+    """
+    Délai avant la tentative `attempt` + 1: backoff exponentiel avec
+    « full jitter » (tirage uniforme), pour éviter les relances synchronisées.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class Deadline:
+    """
+    Échéance d'un appel: elle ne court qu'à partir de l'admission de sa
+    première requête par l'ordonnanceur (l'attente en file a son propre
+    délai, LLM_QUEUE_TIMEOUTS) et couvre les nouvelles tentatives.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.end = None
+
+    def start(self):
+        if self.end is None:
+            self.end = time.monotonic() + self.seconds
+
+    def remaining(self):
+        if self.end is None:
+            return self.seconds
+        return self.end - time.monotonic()
+
+
+class LatencyTracker:
+    """
+    Latences des derniers appels réussis, pour estimer le p95
+    (seuil de déclenchement des requêtes hedgées).
+    """
+
+    def __init__(self, size=200, min_samples=LLM_HEDGE_MIN_SAMPLES):
+        self.samples = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, q):
+        """
+        Quantile q (0-1) des latences observées, None s'il y a trop peu de mesures.
+        """
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur: après `threshold` échecs consécutifs, les appels échouent
+    immédiatement pendant `cooldown` secondes, puis une seule requête
+    d'essai est autorisée (succès: fermeture, échec: nouvelle ouverture,
+    essai sans verdict ou annulé: record_neutral, un autre essai est permis).
+    """
+
+    def __init__(self, threshold=LLM_BREAKER_THRESHOLD, cooldown=LLM_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def check(self):
+        """
+        Lève LLMError("circuit_open") si l'appel ne doit pas être tenté.
+
+        Returns:
+            bool: True si l'appel est la requête d'essai (à terminer par
+            record_success, record_failure ou record_neutral)
+        """
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return False
+            if state == "half_open" and not self._trial:
+                self._trial = True  # une seule requête d'essai
+                return True
+            remaining = max(0, self.cooldown - (time.monotonic() - self.opened_at))
+        raise LLMError("circuit_open", f"Circuit open, retry in {remaining:.0f}s")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+    def record_neutral(self):
+        """
+        Fin de la requête d'essai sans verdict sur le service (requête
+        rejetée, file pleine, appel annulé): l'essai suivant est autorisé.
+        """
+        with self._lock:
+            self._trial = False
@@ -0,0 +1,224 @@
+import asyncio
+import heapq
+import itertools
+import time
+from config import (
+    LLM_MAX_CONCURRENCY, LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE,
+    LLM_PRIORITIES, LLM_QUEUE_LIMITS, LLM_QUEUE_TIMEOUTS,
+)
+from modules.resilience import LLMError
+
+
+class TokenBucket:
+    """
+    Seau à jetons: `per_minute` jetons rechargés en continu, au plus
+    `per_minute` en réserve (rafale max). per_minute=None: pas de limite.
+    """
+
+    def __init__(self, per_minute, clock=time.monotonic):
+        self.capacity = per_minute
+        self.rate = per_minute / 60 if per_minute else None
+        self.level = per_minute
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        if self.rate:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def charge_for(self, amount):
+        """
+        Jetons réellement débités: une demande plus grosse que la réserve
+        attend un seau plein au lieu de bloquer indéfiniment.
+        """
+        return amount if self.capacity is None else min(amount, self.capacity)
+
+    def wait_time(self, amount):
+        """
+        Secondes avant que `amount` jetons soient disponibles (0 = tout de suite).
+        """
+        if self.capacity is None:
+            return 0.0
+        self._refill()
+        return max(0.0, (self.charge_for(amount) - self.level) / self.rate)
+
+    def consume(self, amount):
+        if self.capacity is None:
+            return
+        self._refill()
+        self.level -= self.charge_for(amount)
+
+    def refund(self, amount):
+        """
+        Rend des jetons réservés mais non utilisés (réponse plus courte que max_tokens).
+        """
+        if self.capacity is None or amount <= 0:
+            return
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class Ticket:
+    """
+    Demande d'accès à l'API: `async with scheduler.slot(priority, tokens) as ticket`.
+    `tokens` est l'estimation réservée (prompt + max_tokens); renseigner
+    `ticket.used` après la réponse rend la différence au budget.
+    """
+
+    def __init__(self, scheduler, priority, tokens):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.tokens = tokens
+        self.used = None
+        self.granted = False
+        self.future = None
+        self.queued_at = None
+        self.entry = None
+
+    async def __aenter__(self):
+        await self.scheduler.acquire(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.scheduler.release(self)
+
+
+class RequestScheduler:
+    """
+    Ordonnanceur des requêtes LLM de tout le processus (boucle de LLMService).
+    - budget partagé: seaux à jetons pour les requêtes et les tokens par minute
+      (limites du fournisseur, toutes sessions confondues);
+    - priorités: live > summary > translation > batch; la file est servie par
+      ordre de priorité puis d'arrivée, dans la limite de `max_concurrency`;
+    - admission: une requête est refusée (LLMError "overloaded") si la file
+      de sa classe est pleine ou si elle y attend plus que le délai de sa
+      classe, plutôt que d'attendre sans fin;
+    - métriques: profondeur des files, attente moyenne, refus (metrics()).
+    """
+
+    def __init__(self, max_concurrency=LLM_MAX_CONCURRENCY,
+                 requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+                 priorities=LLM_PRIORITIES, queue_limits=LLM_QUEUE_LIMITS,
+                 queue_timeouts=LLM_QUEUE_TIMEOUTS):
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.priorities = priorities
+        self.queue_limits = queue_limits
+        self.queue_timeouts = queue_timeouts
+        self.in_flight = 0
+        self._queue = []  # tas de (priorité, ordre d'arrivée, ticket)
+        self._order = itertools.count()
+        self._timer = None
+        self._depth = {name: 0 for name in priorities}
+        self._max_depth = {name: 0 for name in priorities}
+        self._admitted = {name: 0 for name in priorities}
+        self._rejected = {name: 0 for name in priorities}
+        self._wait = {name: 0.0 for name in priorities}
+
+    def slot(self, priority="live", tokens=0):
+        return Ticket(self, priority, tokens)
+
+    async def acquire(self, ticket):
+        """
+        Attend que la requête soit servie (priorité, concurrence et budget).
+
+        Raises:
+            LLMError: "overloaded" si la file de sa classe est pleine ou si
+                      l'attente dépasse le délai de sa classe
+        """
+        priority = ticket.priority
+        if priority not in self.priorities:
+            raise ValueError(f"Unknown priority: {priority} (expected one of {tuple(self.priorities)})")
+        depth = self._depth[priority]
+        if depth >= self.queue_limits.get(priority, float("inf")):
+            self._rejected[priority] += 1
+            raise LLMError("overloaded", f"{priority} queue is full ({depth} requests waiting)")
+
+        loop = asyncio.get_running_loop()
+        ticket.future = loop.create_future()
+        ticket.queued_at = loop.time()
+        ticket.entry = (self.priorities[priority], next(self._order), ticket)
+        heapq.heappush(self._queue, ticket.entry)
+        self._depth[priority] += 1
+        self._max_depth[priority] = max(self._max_depth[priority], self._depth[priority])
+        self._dispatch()
+
+        timeout = self.queue_timeouts.get(priority)
+        try:
+            await asyncio.wait_for(ticket.future, timeout)
+        except asyncio.TimeoutError:
+            self._leave(ticket)
+            self._rejected[priority] += 1
+            raise LLMError("overloaded", f"Waited more than {timeout}s in the {priority} queue")
+        except asyncio.CancelledError:
+            # Appel annulé pendant l'attente
+            if ticket.granted:
+                self.release(ticket)
+            else:
+                self._leave(ticket)
+            raise
+
+    def _leave(self, ticket):
+        """
+        Retire de la file une requête qui n'a pas été servie.
+        """
+        self._queue.remove(ticket.entry)
+        heapq.heapify(self._queue)
+        self._depth[ticket.priority] -= 1
+        self._dispatch()
+
+    def release(self, ticket):
+        """
+        Libère la place d'une requête terminée et rend les tokens non utilisés.
+        """
+        self.in_flight -= 1
+        if ticket.used is not None:
+            self.tokens.refund(self.tokens.charge_for(ticket.tokens) - ticket.used)
+        self._dispatch()
+
+    def _dispatch(self):
+        """
+        Sert la tête de file tant que la concurrence et le budget le permettent;
+        sinon programme un nouvel essai quand le budget sera rechargé.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        loop = asyncio.get_running_loop()
+        while self._queue and self.in_flight < self.max_concurrency:
+            ticket = self._queue[0][2]
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(ticket.tokens))
+            if wait > 0:
+                self._timer = loop.call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._queue)
+            self._depth[ticket.priority] -= 1
+            self.requests.consume(1)
+            self.tokens.consume(ticket.tokens)
+            self.in_flight += 1
+            ticket.granted = True
+            self._admitted[ticket.priority] += 1
+            self._wait[ticket.priority] += loop.time() - ticket.queued_at
+            ticket.future.set_result(None)
+
+    def metrics(self):
+        """
+        Instantané des files et du budget (pour l'affichage ou les benchmarks).
+        """
+        return {
+            "in_flight": self.in_flight,
+            "queued": dict(self._depth),
+            "max_queued": dict(self._max_depth),
+            "admitted": dict(self._admitted),
+            "rejected": dict(self._rejected),
+            "avg_wait": {
+                name: self._wait[name] / self._admitted[name] if self._admitted[name] else 0.0
+                for name in self.priorities
+            },
+            "requests_available": self.requests.level,
+            "tokens_available": self.tokens.level,
+        }
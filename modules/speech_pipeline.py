@@ -0,0 +1,140 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from config import TTS_PIPELINE_MIN_CHARS, TTS_PIPELINE_WORKERS
+from modules.feedback import response_part
+from modules.tts import speak
+
+
+# Fin de phrase: ponctuation (éventuellement suivie de guillemets/parenthèses) puis un espace
+SENTENCE_END = re.compile(r'[.!?…]+["\'”’)\]]*\s+')
+
+
+def _read_audio(path):
+    """
+    Contenu d'un fichier audio, ou None s'il n'existe pas (ou plus).
+    """
+    if not path:
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class SentenceSplitter:
+    """
+    Découpe en phrases la partie conversationnelle d'une réponse reçue en flux.
+    Les sections de feedback (Corrections, Vocabulary, Grammar Tip) ne sont
+    jamais retournées: le texte s'arrête au premier marqueur.
+    """
+
+    def __init__(self, min_chars=TTS_PIPELINE_MIN_CHARS):
+        self.min_chars = min_chars
+        self.text = ""
+        self.consumed = 0  # caractères de la partie conversationnelle déjà retournés
+
+    def feed(self, delta):
+        """
+        Ajoute un morceau de texte et retourne les phrases complètes.
+        """
+        self.text += delta
+        visible = response_part(self.text)
+        pending = visible[self.consumed:]
+
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(pending):
+            sentence = pending[start:match.end()].strip()
+            # Phrase trop courte ("Hi!"): envoyée avec la suivante
+            if len(sentence) < self.min_chars:
+                continue
+            sentences.append(sentence)
+            start = match.end()
+        self.consumed += start
+        return sentences
+
+    def flush(self):
+        """
+        Fin du flux: retourne le texte restant (dernière phrase sans espace final).
+        """
+        remainder = response_part(self.text)[self.consumed:].strip()
+        self.consumed = len(response_part(self.text))
+        return [remainder] if remainder else []
+
+
+class SpeechPipeline:
+    """
+    Synthèse vocale phrase par phrase pendant la génération de la réponse:
+    chaque phrase terminée part vers le TTS alors que les tokens suivants
+    arrivent encore. Les fichiers audio sont rendus dans l'ordre des phrases.
+    """
+
+    def __init__(self, synthesize=speak, workers=TTS_PIPELINE_WORKERS):
+        self.synthesize = synthesize
+        self.splitter = SentenceSplitter()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+        self._futures = []
+
+    def _submit(self, sentences):
+        for sentence in sentences:
+            self._futures.append((sentence, self._executor.submit(self.synthesize, sentence)))
+
+    def feed(self, delta):
+        """
+        Ajoute un morceau de la réponse de l'IA (lance la synthèse des phrases terminées).
+        """
+        self._submit(self.splitter.feed(delta))
+
+    def finish(self):
+        """
+        Fin de la réponse: synthétise la dernière phrase.
+        """
+        self._submit(self.splitter.flush())
+        self._executor.shutdown(wait=False)
+
+    def _audio_files(self):
+        """
+        Itère sur (phrase, fichier audio) dans l'ordre des phrases (attend
+        chaque synthèse). Les phrases dont la synthèse a échoué sont ignorées.
+        """
+        for sentence, future in self._futures:
+            try:
+                path = future.result()
+            except Exception as e:
+                print(f"❌ TTS Error: {e}")
+                continue
+            if path:
+                yield sentence, path
+
+    def audio_files(self):
+        """
+        Itère sur les fichiers audio dans l'ordre des phrases (attend chaque synthèse).
+        """
+        for _, path in self._audio_files():
+            yield path
+
+    def wait(self):
+        """
+        Attend la fin de toutes les synthèses.
+        
+        Returns:
+            list: Chemins des fichiers audio, dans l'ordre des phrases
+        """
+        return list(self.audio_files())
+
+    def audio_bytes(self):
+        """
+        Audio complet: les MP3 des phrases concaténés dans l'ordre.
+        """
+        data = b""
+        for sentence, path in self._audio_files():
+            audio = _read_audio(path)
+            if audio is None:
+                # Fichier supprimé entre-temps par l'éviction du cache (autre session): régénéré
+                audio = _read_audio(self.synthesize(sentence))
+            if audio is None:
+                print(f"⚠️ TTS audio skipped: {sentence[:60]}")
+                continue
+            data += audio
+        return data or None
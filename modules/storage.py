@@ -0,0 +1,953 @@
+import heapq
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from modules.fileutils import temp_path_for, file_lock
+from modules.archive import SegmentArchive
+from modules.timerange import to_timestamp, to_day, sorted_range, group_daily, progress_from_turns
+
+
+# Identifiant spécial: lecture fusionnée de tous les apprenants
+ALL_LEARNERS = "*"
+
+
+def is_journal_file(filename):
+    """
+    Indique si un nom de fichier désigne un journal (une ligne JSON par tour).
+    """
+    return filename.endswith(".jsonl")
+
+
+def legacy_filename(filename):
+    """
+    Retourne le chemin de l'ancien fichier (tableau JSON) correspondant à un journal.
+    Ex: data/conversations.jsonl -> data/conversations.json
+    """
+    return os.path.splitext(filename)[0] + ".json"
+
+
+# Taille des blocs lus lors du parsing incrémental de l'ancien format
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _project(turn, fields):
+    """
+    Ne garde que les champs demandés (None = tous les champs).
+    """
+    if fields is None:
+        return turn
+    return {key: turn[key] for key in fields if key in turn}
+
+
+def _iter_json_array(f, filename):
+    """
+    Parse un tableau JSON élément par élément, par blocs de READ_CHUNK_SIZE:
+    seul l'élément en cours de lecture est gardé en mémoire.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    started = False
+
+    while True:
+        # Avancer jusqu'au prochain élément (espaces, '[' initial, virgules)
+        while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == "," or (not started and buffer[pos] == "[")):
+            if buffer[pos] == "[":
+                started = True
+            pos += 1
+
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+
+        if pos < len(buffer):
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                item = None
+            if item is not None:
+                yield item
+                pos = end
+                continue
+
+        # Élément incomplet: lire le bloc suivant
+        chunk = f.read(READ_CHUNK_SIZE)
+        if not chunk:
+            if buffer[pos:].strip():
+                raise ValueError(f"Truncated JSON array in {filename}")
+            return
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def iter_turns(filename, fields=None):
+    """
+    Itère sur les tours d'un fichier sans le charger entièrement en mémoire.
+    Accepte l'ancien format (tableau JSON indenté) et le format journal
+    (une ligne JSON par tour). Le format est détecté sur le premier caractère.
+
+    Args:
+        fields: champs à conserver pour chaque tour (ex: ("user", "timestamp")),
+                None pour garder tous les champs
+    """
+    if not os.path.exists(filename):
+        return
+
+    with open(filename, 'r', encoding='utf-8') as f:
+        # Détecter le format sur le premier caractère non blanc
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        if not first:
+            return
+        f.seek(0)
+
+        # Ancien format: un seul tableau JSON
+        if first == "[":
+            for turn in _iter_json_array(f, filename):
+                yield _project(turn, fields)
+            return
+
+        # Format journal: un objet JSON par ligne
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                turn = json.loads(line)
+            except json.JSONDecodeError:
+                # Dernière ligne tronquée (arrêt brutal pendant l'écriture)
+                print(f"⚠️ Skipping corrupted line {line_number} in {filename}")
+                continue
+            yield _project(turn, fields)
+
+
+def load_turns(filename):
+    """
+    Charge tous les tours depuis un fichier (tableau JSON ou journal).
+    """
+    return list(iter_turns(filename))
+
+
+def append_turns(filename, turns, fsync=False):
+    """
+    Ajoute des tours à la fin du journal en une seule écriture, sans réécrire
+    le reste du fichier. Avec fsync=True, les données sont sur disque au retour.
+    """
+    data = "".join(json.dumps(turn, ensure_ascii=False) + "\n" for turn in turns)
+    with open(filename, 'a+b') as f:
+        # Si la dernière ligne a été tronquée (arrêt brutal), ne pas la prolonger
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                data = "\n" + data
+        f.write(data.encode('utf-8'))
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def append_turn(filename, turn):
+    """
+    Ajoute un tour à la fin du journal, sans réécrire le reste du fichier.
+    """
+    append_turns(filename, [turn])
+
+
+def write_journal(filename, turns):
+    """
+    Réécrit entièrement un journal (fichier temporaire puis renommage atomique).
+    Le fichier temporaire est synchronisé sur disque avant le renommage: après
+    un crash, on retrouve soit l'ancien journal, soit le nouveau complet.
+    """
+    temp_path = temp_path_for(filename)
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for turn in turns:
+                f.write(json.dumps(turn, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, filename)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+# Début des lignes écrites par append_turns (le timestamp est le premier champ)
+_TIMESTAMP_PREFIX = b'{"timestamp": "'
+
+
+def _line_timestamp(line):
+    """
+    Timestamp d'une ligne de journal, sans parser toute la ligne quand elle
+    commence par le timestamp. None pour une ligne illisible.
+    """
+    if line.startswith(_TIMESTAMP_PREFIX):
+        end = line.find(b'"', len(_TIMESTAMP_PREFIX))
+        if end > 0:
+            return line[len(_TIMESTAMP_PREFIX):end].decode('utf-8')
+    try:
+        return json.loads(line).get("timestamp", "")
+    except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+        return None  # ligne tronquée: ignorée comme dans iter_turns
+
+
+class TimestampIndex:
+    """
+    Index trié (timestamp -> position en octets) des lignes d'un journal.
+    Complété de façon incrémentale: seuls les octets ajoutés depuis la
+    dernière requête sont lus. Un journal réécrit (compaction, archivage)
+    change d'inode et est réindexé.
+    Une requête par période ne lit ensuite que les lignes de la période.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, inode):
+        self.timestamps = []
+        self.offsets = []
+        self.ordered = True   # False si le journal n'est pas chronologique
+        self._inode = inode
+        self._size = 0
+
+    def _refresh(self, f):
+        stat = os.fstat(f.fileno())
+        if stat.st_ino != self._inode or stat.st_size < self._size:
+            self._reset(stat.st_ino)
+        if stat.st_size == self._size:
+            return
+
+        f.seek(self._size)
+        offset = self._size
+        for line in f:
+            # Ligne en cours d'écriture: indexée à la prochaine requête
+            if not line.endswith(b"\n"):
+                break
+            stripped = line.strip()
+            if stripped:
+                timestamp = _line_timestamp(stripped)
+                if timestamp is not None:
+                    if self.timestamps and timestamp < self.timestamps[-1]:
+                        self.ordered = False
+                    self.timestamps.append(timestamp)
+                    self.offsets.append(offset)
+            offset += len(line)
+        self._size = offset
+
+    def turns_between(self, start=None, end=None, fields=None):
+        """
+        Tours dont le timestamp est dans [start, end), par recherche dichotomique.
+        """
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, 'rb') as f:
+            with self._lock:
+                self._refresh(f)
+                ordered = self.ordered
+                lo, hi = sorted_range(self.timestamps, start, end)
+                first_offset = self.offsets[lo] if lo < hi else None
+                end_offset = self.offsets[hi] if hi < len(self.offsets) else self._size
+
+            if not ordered:
+                # Journal non chronologique: filtrage complet
+                for turn in iter_turns(self.filename):
+                    timestamp = turn.get("timestamp", "")
+                    if (start is None or timestamp >= start) and (end is None or timestamp < end):
+                        yield _project(turn, fields)
+                return
+
+            if first_offset is None:
+                return
+            f.seek(first_offset)
+            position = first_offset
+            while position < end_offset:
+                line = f.readline()
+                if not line:
+                    break
+                position += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    turn = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                yield _project(turn, fields)
+
+
+# Index partagés par toutes les instances de stockage du processus
+_timestamp_indexes = {}
+_timestamp_indexes_lock = threading.Lock()
+
+
+def timestamp_index(filename):
+    """
+    Retourne l'index des timestamps d'un journal (créé au premier appel).
+    """
+    key = os.path.abspath(filename)
+    with _timestamp_indexes_lock:
+        if key not in _timestamp_indexes:
+            _timestamp_indexes[key] = TimestampIndex(filename)
+        return _timestamp_indexes[key]
+
+
+def migrate_to_journal(source, destination=None):
+    """
+    Convertit un fichier au format tableau JSON en journal JSONL.
+    Le fichier source n'est pas supprimé (il sert de sauvegarde).
+
+    Returns:
+        int: Nombre de tours migrés
+    """
+    if destination is None:
+        destination = os.path.splitext(source)[0] + ".jsonl"
+
+    turns = load_turns(source)
+    write_journal(destination, turns)
+    print(f"📦 Migrated {len(turns)} turns from {source} to {destination}")
+    return len(turns)
+
+
+def ensure_journal(filename):
+    """
+    Si le journal n'existe pas encore mais que l'ancien fichier JSON existe,
+    le migre automatiquement. Ne fait rien pour les fichiers non-journal.
+    """
+    if not is_journal_file(filename) or os.path.exists(filename):
+        return
+
+    legacy = legacy_filename(filename)
+    if os.path.exists(legacy):
+        try:
+            migrate_to_journal(legacy, filename)
+        except Exception as e:
+            print(f"❌ Error migrating {legacy}: {e}")
+
+
+def _is_correction_free(corrections):
+    """Même règle que ProgressTracker: aucune correction ou 'None - well done!'."""
+    return not corrections or corrections == ["None - well done!"]
+
+
+# Équivalent SQL de `text.strip()` non vide
+_NOT_BLANK = "trim(text, ' ' || char(9) || char(10) || char(13)) != ''"
+
+
+class JsonStore:
+    """
+    Stockage fichier: journal JSONL (ajout en fin de fichier) ou ancien
+    tableau JSON (réécrit en entier à chaque sauvegarde).
+    Les tours anciens d'un journal peuvent être déplacés dans une archive
+    de segments compressés (`<fichier>.archive/`, voir modules/archive.py).
+    """
+
+    supports_queries = False
+
+    def __init__(self, filename, journal=None):
+        self.filename = filename
+        self.journal = is_journal_file(filename) if journal is None else journal
+        # Un journal ne réécrit jamais l'historique complet
+        self.append_only = self.journal
+
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.archive = None
+        if self.journal:
+            ensure_journal(filename)
+            self.archive = SegmentArchive(filename + ".archive")
+
+    def archives(self):
+        return [self.archive] if self.archive is not None else []
+
+    def journals(self):
+        """
+        Journaux dont les tours anciens peuvent être archivés.
+        """
+        return [self] if self.journal else []
+
+    def exists(self):
+        return os.path.exists(self.filename)
+
+    def version(self):
+        """
+        Empreinte du contenu (taille, date de modification): change à chaque écriture.
+        """
+        if not self.exists():
+            return None
+        stat = os.stat(self.filename)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def load_all(self):
+        return list(self.iter_turns())
+
+    def iter_turns(self, fields=None, include_archive=True):
+        """
+        Itère sur les tours archivés puis sur ceux du fichier.
+
+        Args:
+            include_archive: False pour ne lire que le fichier actif
+        """
+        if include_archive and self.archive is not None:
+            yield from self.archive.iter_turns(fields)
+        yield from iter_turns(self.filename, fields)
+
+    def count(self):
+        archived = self.archive.count() if self.archive is not None else 0
+        return archived + sum(1 for _ in iter_turns(self.filename, fields=()))
+
+    def turns_between(self, start=None, end=None, fields=None, include_archive=True):
+        """
+        Tours dont le timestamp est dans [start, end) (datetime, date ou chaîne ISO).
+        Un journal est lu via son index de timestamps: seules les lignes de la
+        période sont lues; l'archive n'ouvre que les segments concernés.
+        """
+        start, end = to_timestamp(start), to_timestamp(end)
+        if include_archive and self.archive is not None:
+            yield from self.archive.iter_turns(fields, start, end)
+        if self.journal:
+            yield from timestamp_index(self.filename).turns_between(start, end, fields)
+            return
+        # Ancien format: pas d'index, filtrage en flux
+        read_fields = None if fields is None else tuple(fields) + ("timestamp",)
+        for turn in iter_turns(self.filename, read_fields):
+            timestamp = turn.get("timestamp", "")
+            if (start is None or timestamp >= start) and (end is None or timestamp < end):
+                yield _project(turn, fields)
+
+    def daily_progress(self, start=None, end=None, granularity="day"):
+        """
+        Statistiques {période: {turns, words}} entre deux dates (end exclue),
+        par jour, semaine ou mois.
+        """
+        turns = self.turns_between(to_day(start), to_day(end), fields=("timestamp", "user"))
+        return progress_from_turns(turns, granularity)
+
+    def append(self, turn):
+        append_turn(self.filename, turn)
+
+    def append_many(self, turns, fsync=False):
+        append_turns(self.filename, turns, fsync=fsync)
+
+    def compact(self):
+        """
+        Réécrit le journal en flux (supprime les lignes tronquées) sans le
+        charger en mémoire.
+        """
+        if self.journal and self.exists():
+            write_journal(self.filename, iter_turns(self.filename))
+
+    def retain(self, keep):
+        """
+        Réécrit le journal en ne gardant que les tours pour lesquels keep(turn)
+        est vrai (ex: retirer les tours archivés).
+        L'appelant doit tenir file_lock(self.filename).
+        """
+        if self.journal and self.exists():
+            write_journal(self.filename, (turn for turn in iter_turns(self.filename) if keep(turn)))
+
+    def save_all(self, turns):
+        if self.journal:
+            write_journal(self.filename, turns)
+        else:
+            temp_path = temp_path_for(self.filename)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(turns, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.filename)
+
+    def close(self):
+        pass
+
+
+class SQLiteStore:
+    """
+    Stockage SQLite embarqué: une table `turns` indexée sur le timestamp et
+    des tables filles pour les corrections, le vocabulaire et les tips.
+    Les statistiques de ProgressTracker sont calculées directement en SQL.
+    """
+
+    supports_queries = True
+    append_only = True
+    archive = None
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS turns (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL DEFAULT '',
+        user TEXT NOT NULL DEFAULT '',
+        ai_full_response TEXT NOT NULL DEFAULT '',
+        ai_response TEXT NOT NULL DEFAULT '',
+        user_words INTEGER NOT NULL DEFAULT 0,
+        ai_words INTEGER NOT NULL DEFAULT 0,
+        correction_free INTEGER NOT NULL DEFAULT 1
+    );
+    CREATE INDEX IF NOT EXISTS idx_turns_timestamp ON turns(timestamp);
+    """
+
+    # Tables filles: nom de table == clé dans le dictionnaire du tour
+    CHILD_TABLES = ("corrections", "vocabulary", "grammar_tips")
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        is_new = not os.path.exists(filename)
+        # Streamlit peut réexécuter le script dans un autre thread
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        schema = self.SCHEMA
+        for table in self.CHILD_TABLES:
+            schema += f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+        turn_id INTEGER NOT NULL REFERENCES turns(id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        text TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_{table}_turn ON {table}(turn_id);
+    CREATE INDEX IF NOT EXISTS idx_{table}_text ON {table}(text);
+    """
+        with self._lock:
+            self.conn.executescript(schema)
+
+        if is_new:
+            self._import_legacy()
+
+    def _import_legacy(self):
+        """
+        Importe le journal ou l'ancien fichier JSON voisin (même nom, autre extension).
+        """
+        base = os.path.splitext(self.filename)[0]
+        for candidate in (base + ".jsonl", base + ".json"):
+            if os.path.exists(candidate):
+                try:
+                    turns = load_turns(candidate)
+                    self.save_all(turns)
+                    print(f"📦 Imported {len(turns)} turns from {candidate} into {self.filename}")
+                except Exception as e:
+                    print(f"❌ Error importing {candidate}: {e}")
+                return
+
+    def exists(self):
+        return os.path.exists(self.filename)
+
+    def archives(self):
+        return []
+
+    def journals(self):
+        return []
+
+    def _insert(self, turn):
+        corrections = turn.get("corrections", [])
+        cursor = self.conn.execute(
+            "INSERT INTO turns (timestamp, user, ai_full_response, ai_response,"
+            " user_words, ai_words, correction_free) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                turn.get("timestamp", ""),
+                turn.get("user", ""),
+                turn.get("ai_full_response", ""),
+                turn.get("ai_response", ""),
+                len(turn.get("user", "").split()),
+                len(turn.get("ai_response", "").split()),
+                1 if _is_correction_free(corrections) else 0,
+            ),
+        )
+        turn_id = cursor.lastrowid
+        for table in self.CHILD_TABLES:
+            rows = [(turn_id, i, text) for i, text in enumerate(turn.get(table, []))]
+            if rows:
+                self.conn.executemany(
+                    f"INSERT INTO {table} (turn_id, position, text) VALUES (?, ?, ?)", rows
+                )
+
+    def append(self, turn):
+        with self._lock, self.conn:
+            self._insert(turn)
+
+    def append_many(self, turns, fsync=False):
+        """
+        Insère plusieurs tours dans une seule transaction (un seul commit).
+        """
+        with self._lock:
+            # FULL: le commit attend la synchronisation du WAL sur disque
+            self.conn.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+            with self.conn:
+                for turn in turns:
+                    self._insert(turn)
+
+    def save_all(self, turns):
+        with self._lock, self.conn:
+            for table in self.CHILD_TABLES:
+                self.conn.execute(f"DELETE FROM {table}")
+            self.conn.execute("DELETE FROM turns")
+            for turn in turns:
+                self._insert(turn)
+
+    # Colonnes de la table turns exposées comme champs d'un tour
+    TURN_COLUMNS = ("timestamp", "user", "ai_full_response", "ai_response")
+
+    def iter_turns(self, fields=None, include_archive=True):
+        """
+        Itère sur les tours dans l'ordre d'insertion, sans tout charger:
+        les tables filles sont lues en parallèle (fusion sur turn_id).
+        Seules les colonnes et tables des champs demandés sont lues.
+        """
+        return self._iter_rows(fields)
+
+    def turns_between(self, start=None, end=None, fields=None, include_archive=True):
+        """
+        Tours dont le timestamp est dans [start, end), via l'index idx_turns_timestamp.
+        """
+        return self._iter_rows(fields, to_timestamp(start), to_timestamp(end))
+
+    def _iter_rows(self, fields=None, start=None, end=None):
+        wanted = self.TURN_COLUMNS + self.CHILD_TABLES if fields is None else tuple(fields)
+        columns = [c for c in self.TURN_COLUMNS if c in wanted]
+        tables = [t for t in self.CHILD_TABLES if t in wanted]
+
+        conditions = []
+        params = []
+        if start is not None:
+            conditions.append("t.timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("t.timestamp < ?")
+            params.append(end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        # Curseurs séparés (connexion dédiée: la lecture peut être longue)
+        conn = sqlite3.connect(self.filename)
+        try:
+            turn_rows = conn.execute(
+                f"SELECT {', '.join(['t.id'] + ['t.' + c for c in columns])} FROM turns t {where} ORDER BY t.id",
+                params,
+            )
+            child_cursors = {
+                table: conn.cursor().execute(
+                    f"""SELECT c.turn_id, c.text FROM {table} c JOIN turns t ON t.id = c.turn_id
+                        {where} ORDER BY c.turn_id, c.position""",
+                    params,
+                )
+                for table in tables
+            }
+            pending = {table: next(cursor, None) for table, cursor in child_cursors.items()}
+
+            for row in turn_rows:
+                turn_id = row[0]
+                turn = dict(zip(columns, row[1:]))
+                for table in self.CHILD_TABLES:
+                    if table not in child_cursors:
+                        continue
+                    values = []
+                    current = pending[table]
+                    # Ignorer les lignes orphelines éventuelles
+                    while current is not None and current[0] < turn_id:
+                        current = next(child_cursors[table], None)
+                    while current is not None and current[0] == turn_id:
+                        values.append(current[1])
+                        current = next(child_cursors[table], None)
+                    pending[table] = current
+                    turn[table] = values
+                yield {key: turn[key] for key in wanted if key in turn}
+        finally:
+            conn.close()
+
+    def load_all(self):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, timestamp, user, ai_full_response, ai_response FROM turns ORDER BY id"
+            ).fetchall()
+            children = {}
+            for table in self.CHILD_TABLES:
+                children[table] = {}
+                for turn_id, text in self.conn.execute(
+                    f"SELECT turn_id, text FROM {table} ORDER BY turn_id, position"
+                ):
+                    children[table].setdefault(turn_id, []).append(text)
+
+        turns = []
+        for turn_id, timestamp, user, ai_full_response, ai_response in rows:
+            turns.append({
+                "timestamp": timestamp,
+                "user": user,
+                "ai_full_response": ai_full_response,
+                "ai_response": ai_response,
+                "corrections": children["corrections"].get(turn_id, []),
+                "vocabulary": children["vocabulary"].get(turn_id, []),
+                "grammar_tips": children["grammar_tips"].get(turn_id, []),
+            })
+        return turns
+
+    def _scalar(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()[0]
+
+    def count(self):
+        return self._scalar("SELECT COUNT(*) FROM turns")
+
+    def version(self):
+        """
+        Empreinte du contenu (nombre de tours, dernier id): change à chaque écriture.
+        """
+        with self._lock:
+            return list(self.conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM turns").fetchone())
+
+    def total_words_spoken(self):
+        return self._scalar("SELECT COALESCE(SUM(user_words), 0) FROM turns")
+
+    def total_words_heard(self):
+        return self._scalar("SELECT COALESCE(SUM(ai_words), 0) FROM turns")
+
+    def correction_free_turns(self):
+        return self._scalar("SELECT COALESCE(SUM(correction_free), 0) FROM turns")
+
+    def recurring_errors(self, top_n=5):
+        # Égalités départagées par première apparition (comme Counter.most_common)
+        with self._lock:
+            return [
+                (text, count) for text, count in self.conn.execute(
+                    f"""SELECT text, COUNT(*) AS n FROM corrections
+                        WHERE {_NOT_BLANK} AND text != 'None - well done!'
+                        GROUP BY text ORDER BY n DESC, MIN(rowid) LIMIT ?""",
+                    (top_n,),
+                )
+            ]
+
+    def distinct_texts(self, table):
+        if table not in self.CHILD_TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        with self._lock:
+            return {
+                row[0] for row in self.conn.execute(
+                    f"SELECT DISTINCT text FROM {table} WHERE {_NOT_BLANK}"
+                )
+            }
+
+    def daily_progress(self, start=None, end=None, granularity="day"):
+        """
+        Statistiques {période: {turns, words}} entre deux dates (end exclue);
+        la période est sélectionnée par l'index sur timestamp.
+        """
+        conditions = ["timestamp != ''"]
+        params = []
+        if start is not None:
+            conditions.append("timestamp >= ?")
+            params.append(to_day(start))
+        if end is not None:
+            conditions.append("timestamp < ?")
+            params.append(to_day(end))
+        with self._lock:
+            rows = self.conn.execute(
+                f"""SELECT CASE WHEN instr(timestamp, 'T') > 0
+                               THEN substr(timestamp, 1, instr(timestamp, 'T') - 1)
+                               ELSE timestamp END AS day,
+                          COUNT(*), SUM(user_words)
+                   FROM turns WHERE {' AND '.join(conditions)}
+                   GROUP BY day""",
+                params,
+            ).fetchall()
+        daily = {day: {"turns": turns, "words": words} for day, turns, words in rows}
+        if granularity == "day":
+            return daily
+        return group_daily(sorted(daily.items()), granularity)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def _safe_name(name):
+    """Nom utilisable comme nom de fichier/dossier."""
+    return re.sub(r"[^A-Za-z0-9_-]", "_", name.strip()) or "_"
+
+
+def new_session_id():
+    """Identifiant de session triable chronologiquement (ex: 20251218-103000-1a2b3c4d)."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def learner_directories(root, learner_id):
+    """
+    Dossier(s) d'un apprenant (ou de tous, ALL_LEARNERS), existants ou non.
+    """
+    if learner_id == ALL_LEARNERS:
+        return sorted(
+            entry.path for entry in os.scandir(root) if entry.is_dir()
+        ) if os.path.isdir(root) else []
+    return [os.path.join(root, _safe_name(learner_id))]
+
+
+def list_shard_files(root, learner_id):
+    """
+    Liste triée des journaux de session d'un apprenant (ou de tous, ALL_LEARNERS).
+    """
+    files = []
+    for directory in learner_directories(root, learner_id):
+        if not os.path.isdir(directory):
+            continue
+        files.extend(sorted(
+            entry.path for entry in os.scandir(directory)
+            if entry.is_file() and entry.name.endswith(".jsonl")
+        ))
+    return files
+
+
+class ShardedStore:
+    """
+    Stockage partitionné: un dossier par apprenant et un journal par session,
+    data/learners/<apprenant>/<session>.jsonl.
+    Chaque session n'écrit que dans son propre fichier: les écrivains ne se
+    bloquent jamais entre eux et ne peuvent pas écraser les tours des autres.
+    En lecture, les journaux d'un apprenant (ou de tous, ALL_LEARNERS) sont
+    fusionnés par ordre chronologique, avec l'archive de segments de
+    l'apprenant (data/learners/<apprenant>/archive/).
+    Stockage en ajout seul (append_only): les tours ne sont jamais réécrits,
+    il n'y a donc pas de save_all.
+    """
+
+    supports_queries = False
+    append_only = True
+    journal = True
+
+    def __init__(self, root, learner_id, session_id=None, legacy_file=None):
+        self.root = root
+        self.learner_id = learner_id
+        if learner_id == ALL_LEARNERS:
+            self.filename = root
+            self.shard = None
+            self.archive = None
+            return
+
+        self.filename = os.path.join(root, _safe_name(learner_id))
+        self.archive = SegmentArchive(os.path.join(self.filename, "archive"))
+        is_new = not os.path.isdir(self.filename)
+        os.makedirs(self.filename, exist_ok=True)
+
+        # Importer l'ancien fichier unique comme première session de l'apprenant
+        if is_new and legacy_file:
+            ensure_journal(legacy_file)
+            if os.path.exists(legacy_file):
+                write_journal(os.path.join(self.filename, "imported.jsonl"), iter_turns(legacy_file))
+                print(f"📦 Imported {legacy_file} for learner '{learner_id}'")
+
+        # Journal de la session en écriture (None = lecture seule)
+        self.shard = None
+        if session_id is not None:
+            self.shard = JsonStore(os.path.join(self.filename, _safe_name(session_id) + ".jsonl"))
+
+    def shard_files(self):
+        """
+        Liste triée des journaux lus par ce stockage.
+        """
+        return list_shard_files(self.root, self.learner_id)
+
+    def shards(self):
+        return [JsonStore(path) for path in self.shard_files()]
+
+    def journals(self):
+        return self.shards()
+
+    def archives(self):
+        """
+        Archives lues par ce stockage (une par apprenant).
+        """
+        if self.learner_id != ALL_LEARNERS:
+            return [self.archive]
+        return [
+            SegmentArchive(os.path.join(directory, "archive"))
+            for directory in learner_directories(self.root, self.learner_id)
+        ]
+
+    def exists(self):
+        return bool(self.shard_files())
+
+    def version(self):
+        return [[os.path.basename(path)] + JsonStore(path).version() for path in self.shard_files()]
+
+    def iter_turns(self, fields=None, include_archive=True):
+        """
+        Fusionne les journaux (et les archives) par timestamp: chaque flux
+        est déjà chronologique.
+        """
+        read_fields = None if fields is None else tuple(fields) + ("timestamp",)
+        streams = [iter_turns(path, read_fields) for path in self.shard_files()]
+        if include_archive:
+            streams += [archive.iter_turns(read_fields) for archive in self.archives()]
+        for turn in heapq.merge(*streams, key=lambda t: t.get("timestamp", "")):
+            yield _project(turn, fields)
+
+    def load_all(self):
+        return list(self.iter_turns())
+
+    def turns_between(self, start=None, end=None, fields=None, include_archive=True):
+        """
+        Tours dont le timestamp est dans [start, end), fusionnés par timestamp:
+        chaque journal est lu via son index, chaque archive via ses segments.
+        """
+        start, end = to_timestamp(start), to_timestamp(end)
+        read_fields = None if fields is None else tuple(fields) + ("timestamp",)
+        streams = [
+            timestamp_index(path).turns_between(start, end, read_fields)
+            for path in self.shard_files()
+        ]
+        if include_archive:
+            streams += [archive.iter_turns(read_fields, start, end) for archive in self.archives()]
+        for turn in heapq.merge(*streams, key=lambda t: t.get("timestamp", "")):
+            yield _project(turn, fields)
+
+    def daily_progress(self, start=None, end=None, granularity="day"):
+        """
+        Statistiques {période: {turns, words}} entre deux dates (end exclue).
+        """
+        turns = self.turns_between(to_day(start), to_day(end), fields=("timestamp", "user"))
+        return progress_from_turns(turns, granularity)
+
+    def count(self):
+        return (
+            sum(archive.count() for archive in self.archives())
+            + sum(shard.count() for shard in self.shards())
+        )
+
+    def append(self, turn):
+        if self.shard is None:
+            raise ValueError("Read-only store: no session shard")
+        with file_lock(self.shard.filename):
+            self.shard.append(turn)
+
+    def append_many(self, turns, fsync=False):
+        if self.shard is None:
+            raise ValueError("Read-only store: no session shard")
+        with file_lock(self.shard.filename):
+            self.shard.append_many(turns, fsync=fsync)
+
+    def compact(self):
+        if self.shard is not None:
+            with file_lock(self.shard.filename):
+                self.shard.compact()
+
+    def close(self):
+        pass
+
+
+def open_store(filename, journal=None):
+    """
+    Ouvre le backend de stockage adapté à l'extension du fichier:
+    .db / .sqlite -> SQLiteStore, .jsonl -> journal, .json -> ancien format.
+    """
+    if os.path.splitext(filename)[1] in (".db", ".sqlite", ".sqlite3"):
+        return SQLiteStore(filename)
+    return JsonStore(filename, journal=journal)
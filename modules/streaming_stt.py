@@ -0,0 +1,188 @@
+import re
+import threading
+import time
+import numpy as np
+from config import STT_LANGUAGE, STT_SAMPLE_RATE, STT_STREAM_STEP, STT_STREAM_PROMPT_CHARS
+from modules.stt_registry import get_stt_model
+
+
+# Marge (secondes) pour comparer les horodatages de mots entre deux décodages
+_TIME_TOLERANCE = 0.1
+# Nombre max de mots répétés entre la fin du texte validé et une nouvelle hypothèse
+_MAX_OVERLAP = 5
+
+
+def _normalize(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+class StreamingTranscriber:
+    """
+    Transcription incrémentale pendant la parole (accord local entre hypothèses):
+    - toutes les STT_STREAM_STEP secondes de nouvel audio, la fenêtre non
+      validée est décodée en arrière-plan (hypothèse partielle);
+    - les mots identiques au début de deux hypothèses successives sont
+      validés (préfixe stable) et l'audio correspondant quitte la fenêtre;
+    - à la fin de la parole, seule la fin non validée reste à décoder.
+    `on_partial(committed, tentative)` est appelé après chaque hypothèse.
+    """
+
+    def __init__(self, model=None, samplerate=STT_SAMPLE_RATE, step=STT_STREAM_STEP,
+                 on_partial=None, language=STT_LANGUAGE):
+        self.model = model or get_stt_model()
+        self.samplerate = samplerate
+        self.step = step
+        self.on_partial = on_partial
+        self.language = language
+        self.committed = []           # mots validés: (début, fin, texte), temps absolus
+        self.tentative = []           # mots de la dernière hypothèse, pas encore validés
+        self.decodes = 0
+        self._chunks = []             # audio reçu depuis le début de la fenêtre
+        self._buffer_start = 0.0      # temps absolu du début de la fenêtre
+        self._received = 0            # échantillons reçus au total
+        self._decoded_until = 0       # échantillons couverts par la dernière hypothèse
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._finished = False
+        self._thread = threading.Thread(target=self._run, name="streaming-stt", daemon=True)
+        self._thread.start()
+
+    # --- Audio ---
+
+    def feed(self, frame):
+        """
+        Ajoute une trame d'audio (float32 mono); non bloquant.
+        """
+        with self._wake:
+            self._chunks.append(np.asarray(frame, dtype=np.float32))
+            self._received += len(frame)
+            if self._received - self._decoded_until >= self.step * self.samplerate:
+                self._wake.notify()
+
+    def _window(self):
+        """
+        Copie de la fenêtre non validée (à appeler sous le verrou).
+        """
+        if not self._chunks:
+            return np.zeros(0, dtype=np.float32), self._buffer_start
+        audio = np.concatenate(self._chunks)
+        self._chunks = [audio]
+        return audio, self._buffer_start
+
+    def _trim(self, until):
+        """
+        Retire de la fenêtre l'audio antérieur à `until` (temps absolu).
+        """
+        audio = np.concatenate(self._chunks) if self._chunks else np.zeros(0, dtype=np.float32)
+        cut = int((until - self._buffer_start) * self.samplerate)
+        if cut <= 0:
+            return
+        self._chunks = [audio[cut:]]
+        self._buffer_start = until
+
+    # --- Décodage ---
+
+    def text(self, words=None):
+        return "".join(word for _, _, word in (self.committed if words is None else words)).strip()
+
+    def _decode(self, audio, offset):
+        """
+        Décode la fenêtre; retourne ses mots horodatés en temps absolu.
+        """
+        prompt = self.text()[-STT_STREAM_PROMPT_CHARS:] or None
+        result = self.model.transcribe(
+            audio,
+            language=self.language,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=prompt,
+        )
+        self.decodes += 1
+        words = []
+        for segment in result.get("segments", []):
+            for word in segment.get("words", []):
+                words.append((word["start"] + offset, word["end"] + offset, word["word"]))
+        return words
+
+    def _new_words(self, words):
+        """
+        Mots d'une hypothèse qui suivent le texte déjà validé.
+        """
+        if self.committed:
+            boundary = self.committed[-1][1]
+            words = [w for w in words if w[0] >= boundary - _TIME_TOLERANCE]
+            # Mots de la fin du texte validé redécodés au début de la fenêtre
+            committed = [_normalize(w[2]) for w in self.committed]
+            for n in range(min(_MAX_OVERLAP, len(words), len(committed)), 0, -1):
+                if [_normalize(w[2]) for w in words[:n]] == committed[-n:]:
+                    words = words[n:]
+                    break
+        return words
+
+    def _apply(self, words):
+        """
+        Valide le préfixe commun avec l'hypothèse précédente (sous le verrou).
+        """
+        words = self._new_words(words)
+        agreed = 0
+        while (agreed < len(words) and agreed < len(self.tentative)
+               and _normalize(words[agreed][2]) == _normalize(self.tentative[agreed][2])):
+            agreed += 1
+        if agreed:
+            self.committed.extend(words[:agreed])
+            self._trim(self.committed[-1][1])
+        self.tentative = words[agreed:]
+
+    def _run(self):
+        while True:
+            with self._wake:
+                while not self._finished and self._received - self._decoded_until < self.step * self.samplerate:
+                    self._wake.wait()
+                if self._finished:
+                    return
+                audio, offset = self._window()
+                received = self._received
+            words = self._decode(audio, offset)
+            with self._wake:
+                self._decoded_until = received
+                self._apply(words)
+                committed, tentative = self.text(), self.text(self.tentative)
+            if self.on_partial is not None:
+                self.on_partial(committed, tentative)
+
+    def finish(self):
+        """
+        Fin de la parole: décode la fin non validée et retourne le texte complet.
+        """
+        with self._wake:
+            self._finished = True
+            self._wake.notify()
+        self._thread.join()
+        with self._wake:
+            audio, offset = self._window()
+        if len(audio) >= 0.1 * self.samplerate:
+            words = self._new_words(self._decode(audio, offset))
+            self.committed.extend(words)
+        self.tentative = []
+        return self.text()
+
+
+def transcribe_streaming(record, on_partial=None, model=None):
+    """
+    Enregistre et transcrit en même temps: `record(on_audio)` capture l'énoncé
+    (ex: record_utterance) en passant chaque trame à on_audio.
+
+    Returns:
+        tuple: (texte, délai fin de parole -> texte en secondes), ou (None, None)
+        si rien n'a été enregistré
+    """
+    transcriber = StreamingTranscriber(model=model, on_partial=on_partial)
+    try:
+        audio = record(transcriber.feed)
+    finally:
+        # Arrête le thread de décodage même si l'enregistrement échoue
+        end_of_speech = time.monotonic()
+        text = transcriber.finish()
+    if audio is None:
+        return None, None
+    return text, time.monotonic() - end_of_speech
@@ -1,51 +1,74 @@
-import whisper
-import sounddevice as sd
-import soundfile as sf
-from config import STT_LANGUAGE, STT_TIMEOUT
+from config import STT_LANGUAGE, STT_TIMEOUT, STT_SAMPLE_RATE, STT_STREAMING
+from modules.stt_registry import get_stt_model
 
-# Charger le modèle une seule fois
-_model = None
 
-
-def _get_model():
-    global _model
-    if _model is None:
-        print("📥 Loading Whisper model (first time only)...")
-        _model = whisper.load_model("base")
-    return _model
+def _prepare_audio(source):
+    """
+    Convertit une entrée audio en tableau NumPy 16 kHz (décodage WAV en mémoire).
+    Un fichier d'un autre format est laissé à Whisper (décodage par ffmpeg).
+    """
+    import wave
+    from modules.audio_input import load_audio
+    try:
+        return load_audio(source)
+    except (wave.Error, EOFError):
+        if isinstance(source, str):
+            return source
+        raise
 
 
 def listen_once(timeout=STT_TIMEOUT):
     """
-    Écoute au micro avec détection de fin de parole.
+    Écoute au micro avec détection de fin de parole (VAD, voir modules/vad.py):
+    l'enregistrement démarre avec la parole et s'arrête dès le silence final.
+    Avec STT_STREAMING, la transcription avance pendant la parole (hypothèses
+    partielles affichées): à la fin, seule la dernière fenêtre reste à décoder.
+    L'audio est transcrit directement depuis la mémoire (pas de fichier temporaire).
     """
     print("🎤 Listening... Speak now!")
     print("   (Parle assez fort, en anglais)")
     print("   (Je vais arrêter automatiquement quand tu finiras de parler)")
     
     try:
-        samplerate = 16000
-        duration = 10  # Enregistre max 15 secondes
+        from modules.vad import record_utterance
         
-        print(f"   (Recording for up to {duration} seconds...)")
-        recording = sd.rec(
-            int(samplerate * duration),
-            samplerate=samplerate,
-            channels=1,
-            dtype='float32',
-            device=None
-        )
-        sd.wait()
+        model = get_stt_model()
+        if not model.ready:
+            print("⏳ Speech model is still warming up...")
         
-        temp_file = "temp_audio.wav"
-        sf.write(temp_file, recording, samplerate)
+        if STT_STREAMING:
+            from modules.streaming_stt import transcribe_streaming
+            
+            shown = [0]
+            
+            def show_partial(committed, tentative):
+                line = f"📝 {committed} {tentative}".rstrip() + "…"
+                print("\r" + line.ljust(shown[0]), end="", flush=True)
+                shown[0] = len(line)
+            
+            text, latency = transcribe_streaming(
+                lambda on_audio: record_utterance(timeout, on_audio=on_audio),
+                on_partial=show_partial,
+                model=model,
+            )
+            if shown[0]:
+                print()
+            if text is None:
+                print("❌ No speech detected (silence). Try again.")
+                return None
+            print(f"   (⚡ Text ready {latency:.2f}s after you stopped)")
+        else:
+            audio = record_utterance(timeout)
+            if audio is None:
+                print("❌ No speech detected (silence). Try again.")
+                return None
+            print(f"   (Recorded {len(audio) / STT_SAMPLE_RATE:.1f}s of speech)")
+            
+            print("🔄 Recognizing...")
+            result = model.transcribe(audio, language=STT_LANGUAGE)
+            text = result["text"]
         
-        model = _get_model()
-        
-        print("🔄 Recognizing...")
-        result = model.transcribe(temp_file, language=STT_LANGUAGE)
-        
-        text = result["text"].strip()
+        text = text.strip()
         
         # Filtrer les silences
         if not text or len(text) < 2:
@@ -59,13 +82,16 @@ def listen_once(timeout=STT_TIMEOUT):
         print(f"❌ Error in listen_once: {e}")
         return None
 
-def transcribe_audio_file(file_path):
+def transcribe_audio_file(source):
     """
-    Transcribe an audio file using Whisper.
+    Transcribe audio using Whisper.
+    `source`: chemin de fichier, octets WAV, objet fichier (ex: st.audio_input)
+    ou tableau NumPy à 16 kHz. Les WAV sont décodés, mixés en mono et
+    rééchantillonnés en mémoire: ni fichier temporaire ni processus ffmpeg.
     """
     try:
-        model = _get_model()
-        result = model.transcribe(file_path, language=STT_LANGUAGE)
+        audio = _prepare_audio(source)
+        result = get_stt_model().transcribe(audio, language=STT_LANGUAGE)
         text = result["text"].strip()
         
         if not text or len(text) < 2:
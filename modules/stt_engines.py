@@ -0,0 +1,98 @@
+from config import STT_ENGINE, STT_COMPUTE_TYPE
+
+
+class STTEngine:
+    """
+    Base des moteurs de reconnaissance vocale. Chaque moteur définit `name`
+    (clé de ENGINES) et la méthode
+    transcribe(audio, language=None, word_timestamps=False, initial_prompt=None,
+               condition_on_previous_text=True)
+    qui retourne le format de openai-whisper:
+    {"text": ..., "segments": [{"start", "end", "text", "words": [{"word", "start", "end"}]}]}
+    (les mots ne sont présents qu'avec word_timestamps=True).
+    """
+
+    name = None
+
+    def __init__(self, size, threads=None):
+        self.size = size
+        self.threads = threads
+
+
+class WhisperEngine(STTEngine):
+    """
+    openai-whisper (PyTorch); fp32 sur CPU.
+    """
+
+    name = "whisper"
+
+    def __init__(self, size, threads=None):
+        super().__init__(size, threads)
+        import torch
+        import whisper
+        if threads:
+            torch.set_num_threads(threads)
+        self.model = whisper.load_model(size)
+        self.fp16 = self.model.device.type != "cpu"
+
+    def transcribe(self, audio, language=None, word_timestamps=False, initial_prompt=None,
+                   condition_on_previous_text=True):
+        return self.model.transcribe(
+            audio,
+            language=language,
+            word_timestamps=word_timestamps,
+            initial_prompt=initial_prompt,
+            condition_on_previous_text=condition_on_previous_text,
+            fp16=self.fp16,
+        )
+
+
+class FasterWhisperEngine(STTEngine):
+    """
+    faster-whisper (CTranslate2): mêmes modèles Whisper, poids quantifiés
+    en int8 pour l'inférence CPU (plus rapide, moins de mémoire).
+    """
+
+    name = "faster-whisper"
+
+    def __init__(self, size, threads=None, compute_type=STT_COMPUTE_TYPE):
+        super().__init__(size, threads)
+        from faster_whisper import WhisperModel
+        self.compute_type = compute_type
+        self.model = WhisperModel(size, device="cpu", compute_type=compute_type, cpu_threads=threads or 0)
+
+    def transcribe(self, audio, language=None, word_timestamps=False, initial_prompt=None,
+                   condition_on_previous_text=True):
+        segments, _ = self.model.transcribe(
+            audio,
+            language=language,
+            beam_size=1,  # décodage glouton, comme openai-whisper par défaut
+            word_timestamps=word_timestamps,
+            initial_prompt=initial_prompt,
+            condition_on_previous_text=condition_on_previous_text,
+        )
+        result = []
+        for segment in segments:
+            result.append({
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "words": [
+                    {"word": word.word, "start": word.start, "end": word.end}
+                    for word in (segment.words or [])
+                ],
+            })
+        return {"text": "".join(segment["text"] for segment in result), "segments": result}
+
+
+# Moteurs disponibles (config.STT_ENGINE)
+ENGINES = {engine.name: engine for engine in (WhisperEngine, FasterWhisperEngine)}
+
+
+def load_engine(size, threads=None, engine=STT_ENGINE):
+    """
+    Charge un moteur (les bibliothèques ne sont importées qu'à ce moment).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown STT engine: {engine} (expected one of {tuple(ENGINES)})")
+    return ENGINES[engine](size, threads)
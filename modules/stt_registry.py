@@ -0,0 +1,144 @@
+import threading
+import time
+from functools import partial
+from config import STT_ENGINE, STT_MODEL_SIZE, STT_THREADS, STT_WARM_UP, STT_LANGUAGE, STT_SAMPLE_RATE
+from modules.stt_engines import load_engine
+
+
+# États d'un modèle partagé
+STATES = ("idle", "loading", "warming", "ready", "error")
+
+
+class SharedModel:
+    """
+    Modèle de reconnaissance vocale partagé par toutes les sessions du processus:
+    - chargé une seule fois, en arrière-plan avec warm_up() (chargement + un
+      décodage factice, pour que le 1er tour ne paie ni l'un ni l'autre);
+    - transcriptions sérialisées par un verrou (le modèle n'est pas prévu
+      pour des appels simultanés): les sessions attendent leur tour;
+    - état consultable (state, waiting) pour afficher « warming up » dans l'interface.
+    """
+
+    def __init__(self, size=STT_MODEL_SIZE, threads=STT_THREADS, loader=None, engine=STT_ENGINE):
+        self.size = size
+        self.engine = engine
+        self.threads = threads
+        self.loader = loader or partial(load_engine, engine=engine)
+        self.state = "idle"
+        self.error = None
+        self.load_seconds = None
+        self.waiting = 0              # transcriptions en attente du verrou
+        self._model = None
+        self._ready = threading.Event()
+        self._state_lock = threading.Lock()
+        self._decode_lock = threading.Lock()
+        self._thread = None
+
+    def _load(self):
+        start = time.monotonic()
+        try:
+            print(f"📥 Loading {self.engine} model '{self.size}'...")
+            model = self.loader(self.size, self.threads)
+            self.state = "warming"
+            with self._decode_lock:
+                model.transcribe(_silence(), language=STT_LANGUAGE)
+            self._model = model
+            self.load_seconds = time.monotonic() - start
+            self.state = "ready"
+            print(f"✅ {self.engine} model '{self.size}' ready ({self.load_seconds:.1f}s)")
+        except Exception as e:
+            self.error = e
+            self.state = "error"
+            print(f"❌ Error loading {self.engine} model '{self.size}': {e}")
+        finally:
+            self._ready.set()
+
+    def warm_up(self, background=True):
+        """
+        Lance le chargement (sans effet s'il est déjà lancé).
+        """
+        with self._state_lock:
+            if self.state == "error":
+                # Nouvelle tentative après un échec
+                self.error = None
+                self._ready.clear()
+            elif self.state != "idle":
+                return
+            self.state = "loading"
+            self._thread = threading.Thread(target=self._load, name=f"stt-{self.engine}-{self.size}", daemon=True)
+            self._thread.start()
+        if not background:
+            self._ready.wait()
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def get(self, timeout=None):
+        """
+        Retourne le modèle chargé (le charge si besoin, attend la fin du chauffage).
+
+        Raises:
+            TimeoutError: modèle toujours en chargement après `timeout` secondes
+            RuntimeError: échec du chargement
+        """
+        self.warm_up()
+        if not self._ready.wait(timeout):
+            raise TimeoutError(f"{self.engine} model '{self.size}' is still loading")
+        if self.state == "error":
+            raise RuntimeError(f"{self.engine} model '{self.size}' failed to load: {self.error}")
+        return self._model
+
+    def transcribe(self, audio, **kwargs):
+        """
+        Transcrit `audio` avec le modèle partagé (un décodage à la fois).
+        """
+        model = self.get()
+        with self._state_lock:
+            self.waiting += 1
+        try:
+            self._decode_lock.acquire()
+        finally:
+            with self._state_lock:
+                self.waiting -= 1
+        try:
+            return model.transcribe(audio, **kwargs)
+        finally:
+            self._decode_lock.release()
+
+
+def _silence(seconds=1.0):
+    """
+    Audio factice du chauffage (la première inférence initialise les noyaux du moteur).
+    """
+    import numpy as np
+    return np.zeros(int(seconds * STT_SAMPLE_RATE), dtype=np.float32)
+
+
+# Modèles partagés par moteur et taille (un seul chargement par processus)
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_stt_model(size=STT_MODEL_SIZE, engine=STT_ENGINE):
+    """Retourne le modèle partagé de ce moteur et de cette taille (créé au premier appel, non chargé)."""
+    with _models_lock:
+        if (engine, size) not in _models:
+            _models[(engine, size)] = SharedModel(size, engine=engine)
+        return _models[(engine, size)]
+
+
+def warm_up_stt(size=STT_MODEL_SIZE):
+    """
+    Charge et chauffe le modèle en arrière-plan si STT_WARM_UP est activé
+    (appelé au démarrage de l'application et de la CLI).
+    """
+    if STT_WARM_UP:
+        get_stt_model(size).warm_up()
+
+
+def stt_status(size=STT_MODEL_SIZE):
+    """
+    État du modèle pour l'interface: "idle", "loading", "warming", "ready" ou "error".
+    """
+    return get_stt_model(size).state
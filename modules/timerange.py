@@ -0,0 +1,90 @@
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+
+
+# Regroupements possibles pour daily_progress
+GRANULARITIES = ("day", "week", "month")
+
+
+def to_timestamp(value):
+    """
+    Normalise une borne (datetime, date ou chaîne ISO) en chaîne ISO comparable
+    aux timestamps des tours. None = pas de borne.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+def to_day(value):
+    """
+    Normalise une borne en date ISO (YYYY-MM-DD). None = pas de borne.
+    """
+    value = to_timestamp(value)
+    return None if value is None else value[:10]
+
+
+def bucket_of(day, granularity="day"):
+    """
+    Clé de regroupement d'une date ISO:
+    day -> 2025-12-18, week -> lundi de la semaine (2025-12-15), month -> 2025-12
+    """
+    if granularity == "day":
+        return day
+    if granularity == "month":
+        return day[:7]
+    if granularity == "week":
+        current = date.fromisoformat(day)
+        return (current - timedelta(days=current.weekday())).isoformat()
+    raise ValueError(f"Unknown granularity: {granularity} (expected one of {GRANULARITIES})")
+
+
+def sorted_range(keys, start=None, end=None):
+    """
+    Indices [lo, hi) des clés triées comprises entre start (inclus) et end (exclu),
+    trouvés par recherche dichotomique.
+    """
+    lo = 0 if start is None else bisect_left(keys, start)
+    hi = len(keys) if end is None else bisect_left(keys, end)
+    return lo, max(lo, hi)
+
+
+def group_daily(daily_items, granularity="day"):
+    """
+    Regroupe des statistiques quotidiennes [(date, {turns, words})] par
+    semaine ou par mois.
+    """
+    grouped = {}
+    for day, stats in daily_items:
+        key = bucket_of(day, granularity)
+        if key not in grouped:
+            grouped[key] = {"turns": 0, "words": 0}
+        grouped[key]["turns"] += stats["turns"]
+        grouped[key]["words"] += stats["words"]
+    return grouped
+
+
+def progress_from_turns(turns, granularity="day"):
+    """
+    Statistiques {période: {turns, words}} calculées sur des tours
+    (champs timestamp et user).
+    """
+    grouped = {}
+    for turn in turns:
+        timestamp = turn.get("timestamp", "")
+        if not timestamp:
+            continue
+        key = bucket_of(timestamp.split("T")[0], granularity)
+        if key not in grouped:
+            grouped[key] = {"turns": 0, "words": 0}
+        grouped[key]["turns"] += 1
+        grouped[key]["words"] += len(turn.get("user", "").split())
+    return grouped
+
+
+def last_days(days, now=None):
+    """
+    Borne de début pour « les N derniers jours » (aujourd'hui inclus).
+    """
+    now = now or datetime.now()
+    return (now.date() - timedelta(days=days - 1)).isoformat()
@@ -0,0 +1,24 @@
+import math
+import re
+
+
+# Mots, nombres et signes de ponctuation: approximation locale du tokenizer
+_TOKEN_PIECES = re.compile(r"\w+|[^\w\s]")
+
+# Coût fixe d'un message (rôle + séparateurs du format chat)
+MESSAGE_OVERHEAD = 4
+
+
+def count_tokens(text):
+    """
+    Estime le nombre de tokens d'un texte sans appel réseau:
+    un token par signe de ponctuation, un par tranche de 4 caractères de mot.
+    """
+    return sum(math.ceil(len(piece) / 4) for piece in _TOKEN_PIECES.findall(text))
+
+
+def count_message_tokens(messages):
+    """
+    Estime le nombre de tokens d'une liste de messages chat.
+    """
+    return sum(count_tokens(m.get("content", "")) + MESSAGE_OVERHEAD for m in messages)
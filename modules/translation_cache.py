@@ -0,0 +1,177 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config import (
+    TRANSLATION_CACHE_FILE, TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_TTL, TRANSLATION_CACHE_MEMORY,
+)
+
+
+def normalize_word(word):
+    """
+    Forme canonique d'un mot pour le cache: minuscules, espaces réduits.
+    Ex: "  Good   Morning " -> "good morning"
+    """
+    return " ".join(word.lower().split())
+
+
+class TranslationCache:
+    """
+    Cache persistant des traductions, clé = (mot normalisé, langue source, langue cible).
+    - SQLite (WAL): partagé par toutes les sessions Streamlit et tous les processus;
+    - taille bornée: les entrées les moins récemment utilisées sont supprimées (LRU);
+    - TTL optionnel: une entrée trop ancienne est ignorée puis remplacée;
+    - une copie LRU en mémoire sert les lectures répétées sans accès disque;
+      ses utilisations sont reportées en SQLite par lots (last_used), pour que
+      l'éviction persistante garde aussi les mots les plus demandés.
+    """
+
+    # Report des utilisations servies par la mémoire: tous les N mots ou toutes les N secondes
+    TOUCH_BATCH = 100
+    TOUCH_INTERVAL = 30
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS translations (
+        word TEXT NOT NULL,
+        from_lang TEXT NOT NULL,
+        to_lang TEXT NOT NULL,
+        translation TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_used REAL NOT NULL,
+        PRIMARY KEY (word, from_lang, to_lang)
+    );
+    CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations(last_used);
+    """
+
+    def __init__(self, filename=TRANSLATION_CACHE_FILE, max_entries=TRANSLATION_CACHE_SIZE,
+                 ttl=TRANSLATION_CACHE_TTL, memory_entries=TRANSLATION_CACHE_MEMORY):
+        self.filename = filename
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()  # clé -> (traduction, created_at)
+        self._touched = {}            # clé -> dernière utilisation pas encore écrite
+        self._touched_at = time.time()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(filename, check_same_thread=False, timeout=5)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self.conn.executescript(self.SCHEMA)
+
+    def _expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _remember(self, key, translation, created_at):
+        self._memory[key] = (translation, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _flush_touches(self, now):
+        """
+        Écrit les dates d'utilisation en attente (à appeler sous le verrou).
+        """
+        if self._touched:
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE translations SET last_used = MAX(last_used, ?)"
+                    " WHERE word = ? AND from_lang = ? AND to_lang = ?",
+                    [(used,) + key for key, used in self._touched.items()],
+                )
+            self._touched.clear()
+        self._touched_at = now
+
+    def flush(self):
+        """
+        Écrit tout de suite les utilisations servies par la mémoire.
+        """
+        with self._lock:
+            self._flush_touches(time.time())
+
+    def get(self, word, from_lang, to_lang):
+        """
+        Retourne la traduction en cache, ou None.
+        """
+        key = (normalize_word(word), from_lang, to_lang)
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and not self._expired(cached[1], now):
+                self._memory.move_to_end(key)
+                self._touched[key] = now
+                if len(self._touched) >= self.TOUCH_BATCH or now - self._touched_at >= self.TOUCH_INTERVAL:
+                    self._flush_touches(now)
+                return cached[0]
+            self._memory.pop(key, None)
+
+            row = self.conn.execute(
+                "SELECT translation, created_at FROM translations"
+                " WHERE word = ? AND from_lang = ? AND to_lang = ?",
+                key,
+            ).fetchone()
+            if row is None or self._expired(row[1], now):
+                return None
+            # Date d'utilisation mise à jour pour l'éviction LRU
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE translations SET last_used = ?"
+                    " WHERE word = ? AND from_lang = ? AND to_lang = ?",
+                    (now,) + key,
+                )
+            self._remember(key, row[0], row[1])
+            return row[0]
+
+    def put(self, word, from_lang, to_lang, translation):
+        """
+        Enregistre une traduction et supprime les entrées les moins récemment
+        utilisées au-delà de max_entries.
+        """
+        key = (normalize_word(word), from_lang, to_lang)
+        now = time.time()
+        with self._lock:
+            # Utilisations en attente écrites avant l'éviction
+            self._flush_touches(now)
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO translations"
+                    " (word, from_lang, to_lang, translation, created_at, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    key + (translation, now, now),
+                )
+                self.conn.execute(
+                    "DELETE FROM translations WHERE rowid IN ("
+                    " SELECT rowid FROM translations ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._remember(key, translation, now)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            with self.conn:
+                self.conn.execute("DELETE FROM translations")
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+
+# Instance globale (partagée par toutes les sessions du processus)
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_translation_cache():
+    """Retourne le cache de traductions (ouvert au premier appel)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranslationCache()
+        return _cache
@@ -1,17 +1,35 @@
-from groq import Groq
-from config import GROQ_API_KEY
+import asyncio
+import re
+from config import TRANSLATION_BATCH_TOKENS, TRANSLATION_TOKENS_PER_WORD
+from modules.tokens import count_tokens
+from modules.llm_service import get_llm_service
+from modules.resilience import LLMError
+from modules.translation_cache import get_translation_cache, normalize_word
 
-client = Groq(api_key=GROQ_API_KEY)
+
+# Début d'une entrée numérotée dans une réponse par lots ("1. word", "### 2) word")
+_ITEM_START = re.compile(r"^[#*\s]*(\d+)\s*[.)]", re.MULTILINE)
+_TRANSLATION = re.compile(r"\*\*Translation:\*\*\s*(.+)")
+_EXAMPLE = re.compile(r"\*\*Example:\*\*\s*(.+)")
 
 
 def translate_word(word, from_lang="French", to_lang="English"):
     """
     Traduit un mot ou une expression d'une langue à une autre.
     Retourne la traduction avec une courte explication.
+    Les traductions sont mises en cache (même mot, même sens: pas d'appel réseau).
+    
+    Raises:
+        LLMError: appel en échec (voir modules/resilience.py)
     """
     if not word or not word.strip():
         return None
     
+    cache = get_translation_cache()
+    cached = cache.get(word, from_lang, to_lang)
+    if cached is not None:
+        return cached
+    
     prompt = f"""Translate the following {from_lang} word/phrase to {to_lang}.
 Give a concise response with:
 1. The translation
@@ -23,21 +41,18 @@ Format your response EXACTLY like this:
 **Translation:** [the translation]
 **Example:** [a short example sentence using the word]"""
 
-    try:
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {"role": "system", "content": f"You are a helpful translator from {from_lang} to {to_lang}. Be concise and accurate."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=150,
-            temperature=0.3,
-        )
-        
-        return response.choices[0].message.content
-    
-    except Exception as e:
-        return f"Error: {e}"
+    translation = get_llm_service().chat_sync(
+        [
+            {"role": "system", "content": f"You are a helpful translator from {from_lang} to {to_lang}. Be concise and accurate."},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=150,
+        temperature=0.3,
+        priority="translation",
+        hedge=False,  # pas de requête en double sur le budget partagé avec le direct
+    )
+    cache.put(word, from_lang, to_lang, translation)
+    return translation
 
 
 def translate_to_english(french_word):
@@ -52,3 +67,143 @@ def translate_to_french(english_word):
     Traduit un mot anglais en français.
     """
     return translate_word(english_word, "English", "French")
+
+
+def parse_translation(text):
+    """
+    Extrait {translation, example} d'une réponse au format
+    **Translation:** ... / **Example:** ... (None si pas de traduction).
+    """
+    translation = _TRANSLATION.search(text or "")
+    if not translation:
+        return None
+    example = _EXAMPLE.search(text)
+    return {
+        "translation": translation.group(1).strip(),
+        "example": example.group(1).strip() if example else "",
+    }
+
+
+def format_translation(result):
+    """
+    Réponse au format de translate_word (c'est ce format qui est mis en cache).
+    """
+    return f"**Translation:** {result['translation']}\n**Example:** {result['example']}"
+
+
+def chunk_words(words, token_budget=TRANSLATION_BATCH_TOKENS):
+    """
+    Découpe une liste de mots en lots dont la réponse estimée tient dans
+    `token_budget` tokens (au moins un mot par lot).
+    """
+    chunks = []
+    current = []
+    used = 0
+    for word in words:
+        cost = TRANSLATION_TOKENS_PER_WORD + count_tokens(word)
+        if current and used + cost > token_budget:
+            chunks.append(current)
+            current = []
+            used = 0
+        current.append(word)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _parse_batch(text, count):
+    """
+    Associe chaque entrée numérotée d'une réponse par lots à son index (0..count-1).
+    """
+    starts = list(_ITEM_START.finditer(text))
+    results = {}
+    for i, match in enumerate(starts):
+        index = int(match.group(1)) - 1
+        end = starts[i + 1].start() if i + 1 < len(starts) else len(text)
+        parsed = parse_translation(text[match.start():end])
+        if 0 <= index < count and parsed and index not in results:
+            results[index] = parsed
+    return results
+
+
+def _batch_messages(words, from_lang, to_lang):
+    listing = "\n".join(f"{i}. {word}" for i, word in enumerate(words, 1))
+    prompt = f"""Translate each of the following {from_lang} words/phrases to {to_lang}.
+For each one, give the translation and a brief example sentence in {to_lang}.
+
+Words to translate:
+{listing}
+
+Format your response EXACTLY like this, keeping the same numbers and order:
+1. [word]
+**Translation:** [the translation]
+**Example:** [a short example sentence using the word]"""
+    return [
+        {"role": "system", "content": f"You are a helpful translator from {from_lang} to {to_lang}. Be concise and accurate."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+async def _translate_chunks(service, chunks, from_lang, to_lang):
+    """
+    Envoie tous les lots en parallèle (la concurrence est bornée par le service).
+    """
+    requests = [
+        service.chat(
+            _batch_messages(chunk, from_lang, to_lang),
+            max_tokens=len(chunk) * TRANSLATION_TOKENS_PER_WORD + 100,
+            temperature=0.3,
+            priority="batch",
+            hedge=False,  # pas de requête en double sur le budget partagé avec le direct
+        )
+        for chunk in chunks
+    ]
+    return await asyncio.gather(*requests, return_exceptions=True)
+
+
+def translate_many(words, from_lang="French", to_lang="English"):
+    """
+    Traduit une liste de mots en quelques requêtes: les mots absents du cache
+    sont regroupés en lots (budget de tokens) envoyés en parallèle.
+
+    Returns:
+        tuple: ({mot: {"translation": ..., "example": ...} ou None}, liste des
+        mots non traduits: lot en échec ou absent de la réponse, à relancer)
+
+    Raises:
+        LLMError: si aucun lot n'a abouti
+    """
+    cache = get_translation_cache()
+    results = {}
+    missing = {}  # mot normalisé -> mots d'origine
+    for word in words:
+        if not word or not word.strip() or word in results:
+            continue
+        cached = cache.get(word, from_lang, to_lang)
+        results[word] = parse_translation(cached) if cached is not None else None
+        if results[word] is None:
+            missing.setdefault(normalize_word(word), []).append(word)
+
+    if not missing:
+        return results, []
+
+    pending = [originals[0] for originals in missing.values()]
+    chunks = chunk_words(pending)
+    service = get_llm_service()
+    replies = service.submit(_translate_chunks(service, chunks, from_lang, to_lang)).result()
+
+    errors = []
+    for chunk, reply in zip(chunks, replies):
+        if isinstance(reply, BaseException):
+            errors.append(reply)
+            continue
+        for index, parsed in _parse_batch(reply, len(chunk)).items():
+            cache.put(chunk[index], from_lang, to_lang, format_translation(parsed))
+            for original in missing[normalize_word(chunk[index])]:
+                results[original] = parsed
+
+    if errors and len(errors) == len(chunks):
+        error = errors[0]
+        raise error if isinstance(error, LLMError) else LLMError("error", str(error))
+    return results, [word for word, result in results.items() if result is None]
@@ -3,12 +3,14 @@ import os
 import re
 import asyncio
 import hashlib
-import edge_tts
+import threading
 from config import TTS_RATE_MIN, TTS_RATE_MAX, TTS_RATE_STEP, tts_settings
 
 
 # Cache pour éviter de régénérer les mêmes audios
+# (partagé par les threads de SpeechPipeline et les sessions: accès sous verrou)
 _audio_cache = {}
+_audio_cache_lock = threading.Lock()
 MAX_CACHE_SIZE = 50
 
 # Voix disponibles (edge-tts - Microsoft)
@@ -118,6 +120,7 @@ def _get_rate_string(rate):
 
 async def _speak_async(text, voice, rate_str, output_path):
     """Génère l'audio de manière asynchrone avec edge-tts."""
+    import edge_tts  # import différé: chargé à la première synthèse
     communicate = edge_tts.Communicate(text, voice, rate=rate_str)
     await communicate.save(output_path)
 
@@ -144,11 +147,11 @@ def speak(text, save_to_file=True, voice=None):
     
     # Vérifier le cache
     cache_key = _get_cache_key(text, rate, voice)
-    if cache_key in _audio_cache:
-        cached_path = _audio_cache[cache_key]
-        if os.path.exists(cached_path):
-            print(f"🔊 AI (cached, rate={rate_str}): {text[:60]}...")
-            return cached_path
+    with _audio_cache_lock:
+        cached_path = _audio_cache.get(cache_key)
+    if cached_path is not None and os.path.exists(cached_path):
+        print(f"🔊 AI (cached, rate={rate_str}): {text[:60]}...")
+        return cached_path
     
     print(f"🔊 AI (rate={rate_str}): {text[:60]}...")
 
@@ -163,18 +166,21 @@ def speak(text, save_to_file=True, voice=None):
         
         # Vérifier que le fichier existe et a du contenu
         if os.path.exists(temp_path) and os.path.getsize(temp_path) > 0:
-            # Gérer le cache (limiter la taille)
-            if len(_audio_cache) >= MAX_CACHE_SIZE:
-                # Supprimer le plus ancien
-                oldest_key = next(iter(_audio_cache))
-                oldest_path = _audio_cache.pop(oldest_key)
-                if os.path.exists(oldest_path):
-                    try:
-                        os.remove(oldest_path)
-                    except:
-                        pass
-            
-            _audio_cache[cache_key] = temp_path
+            # Gérer le cache (limiter la taille): supprimer les plus anciens
+            evicted = []
+            with _audio_cache_lock:
+                previous = _audio_cache.pop(cache_key, None)
+                if previous is not None and previous != temp_path:
+                    evicted.append(previous)
+                while len(_audio_cache) >= MAX_CACHE_SIZE:
+                    evicted.append(_audio_cache.pop(next(iter(_audio_cache))))
+                _audio_cache[cache_key] = temp_path
+            # Un lecteur peut encore attendre ce fichier: il le régénère s'il a disparu
+            for path in evicted:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
             return temp_path
         return None
         
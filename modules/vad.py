@@ -0,0 +1,123 @@
+import queue
+import time
+from collections import deque
+import numpy as np
+from config import (
+    STT_TIMEOUT, STT_SAMPLE_RATE, STT_FRAME_MS, STT_VAD_THRESHOLD_DB, STT_VAD_START_MS,
+    STT_PRE_ROLL_MS, STT_HANGOVER_MS, STT_MAX_UTTERANCE,
+)
+from modules.audio_input import open_input_stream
+
+
+def frame_db(frame):
+    """
+    Énergie d'une trame en dBFS (0 = pleine échelle, -100 = silence numérique).
+    """
+    rms = float(np.sqrt(np.mean(np.square(frame, dtype=np.float64)))) if len(frame) else 0.0
+    return 20 * np.log10(rms) if rms > 1e-5 else -100.0
+
+
+class Endpointer:
+    """
+    Détection de début et de fin d'énoncé, trame par trame (énergie):
+    - début: STT_VAD_START_MS de parole continue (les clics sont ignorés),
+      en gardant STT_PRE_ROLL_MS d'audio avant pour ne pas couper le 1er mot;
+    - fin: STT_HANGOVER_MS de silence après la parole, ou STT_MAX_UTTERANCE.
+    États: "waiting" (pas encore de parole), "speech", "done".
+    """
+
+    def __init__(self, samplerate=STT_SAMPLE_RATE, frame_ms=STT_FRAME_MS,
+                 threshold_db=STT_VAD_THRESHOLD_DB, start_ms=STT_VAD_START_MS,
+                 pre_roll_ms=STT_PRE_ROLL_MS, hangover_ms=STT_HANGOVER_MS,
+                 max_utterance=STT_MAX_UTTERANCE):
+        self.frame_samples = int(samplerate * frame_ms / 1000)
+        self.threshold_db = threshold_db
+        self.start_frames = max(1, round(start_ms / frame_ms))
+        self.hangover_frames = max(1, round(hangover_ms / frame_ms))
+        self.max_frames = int(max_utterance * 1000 / frame_ms)
+        self.state = "waiting"
+        self.reason = None        # "silence" ou "max_utterance" une fois terminé
+        self.frames_seen = 0      # trames analysées depuis le début
+        self.speech_start = None  # indice de la 1re trame de parole
+        self.frames = []
+        self._pre_roll = deque(maxlen=round(pre_roll_ms / frame_ms) + self.start_frames)
+        self._voiced_run = 0
+        self._silent_run = 0
+
+    def feed(self, frame):
+        """
+        Analyse une trame de `frame_samples` échantillons; retourne l'état.
+        """
+        if self.state == "done":
+            return self.state
+        self.frames_seen += 1
+        voiced = frame_db(frame) > self.threshold_db
+
+        if self.state == "waiting":
+            self._pre_roll.append(frame)
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= self.start_frames:
+                self.state = "speech"
+                self.speech_start = self.frames_seen - self.start_frames
+                self.frames = list(self._pre_roll)
+            return self.state
+
+        self.frames.append(frame)
+        self._silent_run = 0 if voiced else self._silent_run + 1
+        if self._silent_run >= self.hangover_frames:
+            self.state, self.reason = "done", "silence"
+        elif len(self.frames) >= self.max_frames:
+            self.state, self.reason = "done", "max_utterance"
+        return self.state
+
+    def audio(self):
+        """
+        Énoncé capturé (float32 mono), silence final compris.
+        """
+        if not self.frames:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(self.frames).astype(np.float32)
+
+
+def record_utterance(timeout=STT_TIMEOUT, endpointer=None, open_stream=open_input_stream,
+                     on_audio=None):
+    """
+    Capture un énoncé au micro en flux (InputStream + callback): la capture
+    s'arrête dès le silence final détecté au lieu d'une durée fixe.
+    `on_audio(frame)` reçoit chaque trame de l'énoncé (pré-roll compris) dès
+    qu'elle est captée: transcription incrémentale pendant la parole.
+
+    Returns:
+        np.ndarray: audio float32 mono à STT_SAMPLE_RATE, ou None si
+        personne n'a parlé pendant `timeout` secondes
+    """
+    endpointer = endpointer or Endpointer()
+    blocks = queue.Queue()
+
+    def callback(indata, frame_count, time_info, status):
+        # Thread audio: copier et rendre la main tout de suite
+        blocks.put(indata[:, 0].copy())
+
+    size = endpointer.frame_samples
+    pending = np.zeros(0, dtype=np.float32)
+    delivered = 0
+    with open_stream(samplerate=STT_SAMPLE_RATE, blocksize=size, channels=1,
+                     dtype='float32', callback=callback):
+        deadline = time.monotonic() + timeout
+        while endpointer.state != "done":
+            if endpointer.state == "waiting" and time.monotonic() > deadline:
+                return None
+            try:
+                block = blocks.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            # Les blocs du périphérique peuvent avoir une autre taille que la trame
+            pending = np.concatenate([pending, block])
+            while len(pending) >= size and endpointer.state != "done":
+                endpointer.feed(pending[:size])
+                pending = pending[size:]
+                if on_audio is not None:
+                    for frame in endpointer.frames[delivered:]:
+                        on_audio(frame)
+                    delivered = len(endpointer.frames)
+    return endpointer.audio()
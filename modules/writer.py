@@ -0,0 +1,121 @@
+import atexit
+import threading
+import time
+from config import WRITE_FLUSH_INTERVAL
+
+
+class BackgroundWriter:
+    """
+    Écriture différée des tours dans un thread en arrière-plan.
+    Les tours soumis pendant `flush_interval` secondes sont regroupés et
+    écrits en une seule fois (group commit): un tour ne paie plus la
+    sauvegarde dans sa latence.
+    """
+
+    def __init__(self, flush_interval=WRITE_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._items = []          # (sink, tour) en attente
+        self._in_flight = 0       # tours en cours d'écriture
+        self._flush_requested = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="conversation-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, sink, turn):
+        """
+        Met un tour en attente d'écriture.
+        `sink` doit avoir une méthode `_write_batch(turns)` (ex: ConversationManager).
+        """
+        with self._cond:
+            self._start()
+            self._items.append((sink, turn))
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._items:
+                    self._cond.wait()
+
+                # Laisser arriver d'autres tours pour les écrire ensemble
+                deadline = time.monotonic() + self.flush_interval
+                while not self._flush_requested:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch, self._items = self._items, []
+                self._in_flight = len(batch)
+
+            self._commit(batch)
+
+            with self._cond:
+                self._in_flight = 0
+                if not self._items:
+                    self._flush_requested = False
+                self._cond.notify_all()
+
+    def _commit(self, batch):
+        """
+        Écrit un lot: un appel par destination, dans l'ordre de soumission.
+        """
+        grouped = {}
+        for sink, turn in batch:
+            grouped.setdefault(id(sink), (sink, []))[1].append(turn)
+
+        for sink, turns in grouped.values():
+            try:
+                sink._write_batch(turns)
+            except Exception as e:
+                print(f"❌ Auto-save error: {e}")
+
+    def flush(self, timeout=None):
+        """
+        Attend que tous les tours en attente soient écrits.
+
+        Returns:
+            bool: True si tout a été écrit avant le timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if self._items or self._in_flight:
+                self._flush_requested = True
+                self._cond.notify_all()
+            while self._items or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+
+# Instance globale (partagée par toutes les sessions du processus)
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Retourne le writer global (créé au premier appel)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BackgroundWriter()
+        return _writer
+
+
+def flush_all(timeout=None):
+    """
+    Écrit immédiatement tous les tours en attente.
+    Appelé par save(), à la sortie de l'interpréteur et sur Ctrl+C dans main.py.
+    """
+    if _writer is None:
+        return True
+    return _writer.flush(timeout)
+
+
+atexit.register(flush_all)
@@ -1,18 +1,20 @@
-import os
-import tempfile
-import requests
 import base64
 import streamlit as st
-from streamlit_lottie import st_lottie
 
-from modules.llm_client import ask_llm, LEARNING_MODES
-from modules.feedback import extract_feedback
+from modules.llm_client import ask_llm_stream, LEARNING_MODES
+from modules.context import ContextWindow
+from modules.resilience import LLMError
+from modules.feedback import extract_feedback, response_part
+from modules.speech_pipeline import SpeechPipeline
 from modules.conversation import ConversationManager
-from modules.analytics import ProgressTracker
+from modules.analytics import get_progress_tracker
+from modules.maintenance import start_background_maintenance
+from modules.timerange import last_days
 from modules.stt import transcribe_audio_file
-from modules.translator import translate_word
+from modules.stt_registry import warm_up_stt, stt_status
+from modules.translator import translate_word, translate_many
 from modules.tts import VOICES, voice_settings, set_voice, get_voice
-from config import tts_settings, TTS_RATE_MIN, TTS_RATE_MAX, TTS_RATE_DEFAULT
+from config import tts_settings, TTS_RATE_MIN, TTS_RATE_MAX, TTS_RATE_DEFAULT, DEFAULT_LEARNER
 
 
 def autoplay_audio(audio_bytes):
@@ -40,21 +42,13 @@ st.set_page_config(
     layout="wide",
 )
 
-@st.cache_data(show_spinner=False)
-def load_lottie_url(url: str):
-    try:
-        r = requests.get(url, timeout=10)
-        if r.status_code != 200:
-            return None
-        return r.json()
-    except Exception:
-        return None
-
-
-# Avatars (tu peux remplacer par d'autres liens Lottie plus “humains”)
-# Animations Lottie pour l'assistant (robot)
-LOTTIE_IDLE = load_lottie_url("https://assets5.lottiefiles.com/packages/lf20_M9p23l.json")
-LOTTIE_TALKING = load_lottie_url("https://assets3.lottiefiles.com/packages/lf20_kyu7xb1v.json")
+# Périodes du graphique d'activité (nombre de jours, None = tout l'historique)
+ACTIVITY_PERIODS = {
+    "Last 7 days": 7,
+    "Last 30 days": 30,
+    "Last 12 months": 365,
+    "All time": None,
+}
 
 
 # ---------- CSS (bleu clair + moins d'espace en haut + micro gros) ----------
@@ -153,10 +147,20 @@ div[data-testid="stAudioInput"] button:hover {
 )
 
 # ---------- SESSION ----------
+# Archivage des anciens tours (un seul thread par processus)
+start_background_maintenance()
+# Modèle Whisper chargé et chauffé en arrière-plan (partagé par toutes les sessions)
+warm_up_stt()
+
+if "learner_id" not in st.session_state:
+    st.session_state.learner_id = DEFAULT_LEARNER
 if "manager" not in st.session_state:
-    st.session_state.manager = ConversationManager()
+    st.session_state.manager = ConversationManager(learner_id=st.session_state.learner_id)
 if "history" not in st.session_state:
     st.session_state.history = []
+if "context" not in st.session_state:
+    # Fenêtre de contexte (repart de zéro quand history est réinitialisé)
+    st.session_state.context = ContextWindow()
 if "turns" not in st.session_state:
     st.session_state.turns = []
 if "role" not in st.session_state:
@@ -246,10 +250,14 @@ if st.sidebar.button("🔍 Translate", use_container_width=True):
     if word_to_translate.strip():
         with st.sidebar:
             with st.spinner("Translating..."):
-                if "FR to EN" in trans_direction:
-                    result = translate_word(word_to_translate, "French", "English")
-                else:
-                    result = translate_word(word_to_translate, "English", "French")
+                try:
+                    if "FR to EN" in trans_direction:
+                        result = translate_word(word_to_translate, "French", "English")
+                    else:
+                        result = translate_word(word_to_translate, "English", "French")
+                except LLMError as e:
+                    result = None
+                    st.sidebar.error(e.user_message)
                 
                 if result:
                     st.sidebar.markdown(f"""
@@ -277,6 +285,11 @@ if page == "Talk":
         st.subheader("Speak")
         audio_data = st.audio_input("Record", label_visibility="collapsed")
         st.markdown('<div class="small-hint">Clique sur le micro, parle, puis stop.</div>', unsafe_allow_html=True)
+        speech_state = stt_status()
+        if speech_state in ("idle", "loading", "warming"):
+            st.caption("🔥 Speech recognition is warming up…")
+        elif speech_state == "error":
+            st.caption("⚠️ Speech recognition model failed to load.")
         st.markdown("</div>", unsafe_allow_html=True)
 
         # Mode
@@ -296,53 +309,64 @@ if page == "Talk":
                 st.session_state.avatar_state = "idle"
                 st.session_state.last_ai_audio_bytes = None
 
-                with st.spinner("Transcription…"):
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as f:
-                        f.write(audio_data.getbuffer())
-                        temp_path = f.name
-                    try:
-                        user_text = transcribe_audio_file(temp_path)
-                    finally:
-                        if os.path.exists(temp_path):
-                            os.remove(temp_path)
+                spinner_text = "Transcription…" if stt_status() == "ready" else "Speech model warming up, transcription will follow…"
+                with st.spinner(spinner_text):
+                    # Décodage WAV en mémoire: ni fichier temporaire ni ffmpeg
+                    user_text = transcribe_audio_file(audio_data.getvalue())
 
                 if not user_text:
                     st.error("Je n’ai pas bien entendu. Réessaie en parlant plus clairement.")
                 else:
                     st.markdown(f'<div class="user-bubble"><b>You:</b> {user_text}</div>', unsafe_allow_html=True)
 
-                    with st.spinner("Réponse IA…"):
-                        response, st.session_state.history = ask_llm(
-                            st.session_state.history,
-                            user_text,
-                            role=st.session_state.role,
-                            learning_mode=st.session_state.learning_mode,
-                        )
-                    feedback = extract_feedback(response)
-
-                    turn = {"user": user_text, "feedback": feedback}
-                    st.session_state.turns.append(turn)
-                    st.session_state.manager.add_turn(user_text, response, feedback)
-
-                    with st.spinner("Voix…"):
-                        from modules.tts import speak
-                        audio_file = speak(feedback["response"])
-                        audio_bytes = None
-                        if audio_file and os.path.exists(audio_file):
-                            with open(audio_file, "rb") as f:
-                                audio_bytes = f.read()
-
-                    st.session_state.last_ai_audio_bytes = audio_bytes
-                    st.session_state.avatar_state = "speaking"
-
-                    st.markdown(
-                        f'<div class="ai-bubble"><b>AI:</b> {feedback["response"]}</div>',
-                        unsafe_allow_html=True,
+                    # Réponse IA affichée au fil de l'eau (sans les sections de feedback)
+                    chunks, st.session_state.history = ask_llm_stream(
+                        st.session_state.history,
+                        user_text,
+                        role=st.session_state.role,
+                        learning_mode=st.session_state.learning_mode,
+                        context=st.session_state.context,
                     )
-                    
-                    # Jouer l'audio automatiquement (une seule méthode pour éviter la superposition)
-                    if audio_bytes:
-                        st.audio(audio_bytes, format="audio/mp3", autoplay=True)
+                    live_bubble = st.empty()
+                    # Synthèse vocale phrase par phrase pendant la génération
+                    pipeline = SpeechPipeline()
+                    response = ""
+                    try:
+                        for chunk in chunks:
+                            response += chunk
+                            pipeline.feed(chunk)
+                            live_bubble.markdown(
+                                f'<div class="ai-bubble"><b>AI:</b> {response_part(response)}▌</div>',
+                                unsafe_allow_html=True,
+                            )
+                    except LLMError as e:
+                        response = None
+                        st.error(e.user_message)
+                    live_bubble.empty()
+                    pipeline.finish()
+
+                    if response is not None:
+                        feedback = extract_feedback(response)
+
+                        turn = {"user": user_text, "feedback": feedback}
+                        st.session_state.turns.append(turn)
+                        st.session_state.manager.add_turn(user_text, response, feedback)
+
+                        with st.spinner("Voix…"):
+                            # MP3 des phrases concaténés dans l'ordre
+                            audio_bytes = pipeline.audio_bytes()
+
+                        st.session_state.last_ai_audio_bytes = audio_bytes
+                        st.session_state.avatar_state = "speaking"
+
+                        st.markdown(
+                            f'<div class="ai-bubble"><b>AI:</b> {feedback["response"]}</div>',
+                            unsafe_allow_html=True,
+                        )
+                        
+                        # Jouer l'audio automatiquement (une seule méthode pour éviter la superposition)
+                        if audio_bytes:
+                            st.audio(audio_bytes, format="audio/mp3", autoplay=True)
 
         # Historique (replié pour éviter de scroller)
         with st.expander("History", expanded=False):
@@ -359,8 +383,9 @@ if page == "Talk":
         with c2:
             if st.button("Reset"):
                 st.session_state.history = []
+                st.session_state.context.reset()
                 st.session_state.turns = []
-                st.session_state.manager = ConversationManager()
+                st.session_state.manager = ConversationManager(learner_id=st.session_state.learner_id)
                 st.session_state.last_audio_hash = None
                 st.session_state.avatar_state = "idle"
                 st.session_state.last_ai_audio_bytes = None
@@ -417,7 +442,7 @@ if page == "Talk":
 elif page == "Progress":
     st.markdown('<div class="h-title">📊 Progress Dashboard</div>', unsafe_allow_html=True)
     
-    tracker = ProgressTracker()
+    tracker = get_progress_tracker(learner_id=st.session_state.learner_id)
     
     # Statistiques principales en cartes
     col1, col2, col3, col4 = st.columns(4)
@@ -452,7 +477,16 @@ elif page == "Progress":
     st.markdown('<div class="card">', unsafe_allow_html=True)
     st.subheader("📅 Daily Activity")
     
-    daily_stats = tracker.get_daily_progress()
+    range_col, granularity_col = st.columns(2)
+    with range_col:
+        period = st.selectbox("Period", list(ACTIVITY_PERIODS), index=1)
+    with granularity_col:
+        granularity = st.radio("Group by", ["day", "week", "month"], horizontal=True)
+    
+    # Seule la période choisie est lue (index des timestamps)
+    days = ACTIVITY_PERIODS[period]
+    start = last_days(days) if days else None
+    daily_stats = tracker.get_daily_progress(start=start, granularity=granularity)
     if daily_stats:
         import pandas as pd
         df = pd.DataFrame([
@@ -509,7 +543,7 @@ elif page == "Progress":
 elif page == "Vocab":
     st.markdown('<div class="h-title">📚 Vocabulary Bank</div>', unsafe_allow_html=True)
     
-    tracker = ProgressTracker()
+    tracker = get_progress_tracker(learner_id=st.session_state.learner_id)
     vocab = sorted(tracker.get_vocabulary_learned())
     
     # Stats
@@ -557,7 +591,33 @@ elif page == "Vocab":
         # Export option
         st.markdown('<div class="card">', unsafe_allow_html=True)
         st.subheader("📥 Export")
-        vocab_text = "\n".join([f"• {v}" for v in vocab])
+        # Traductions gardées entre les réexécutions du script: l'API n'est
+        # appelée qu'au clic, et seulement pour les mots pas encore traduits
+        export = st.session_state.get("vocab_export")
+        if export is None or export["vocab"] != vocab:
+            export = {"vocab": vocab, "translations": {}, "pending": list(vocab)}
+            st.session_state.vocab_export = export
+        if export["pending"]:
+            if export["translations"]:
+                st.warning(f"⚠️ {len(export['pending'])} words not translated")
+            label = "🔁 Retry untranslated words" if export["translations"] else "🌍 Add French translations"
+            if st.button(label):
+                try:
+                    with st.spinner(f"Translating {len(export['pending'])} words..."):
+                        results, export["pending"] = translate_many(export["pending"], "English", "French")
+                    export["translations"].update((word, result) for word, result in results.items() if result)
+                    st.rerun()
+                except LLMError as e:
+                    st.error(e.user_message)
+        
+        lines = []
+        for v in vocab:
+            result = export["translations"].get(v)
+            if result:
+                lines.append(f"• {v} → {result['translation']}\n    {result['example']}")
+            else:
+                lines.append(f"• {v}")
+        vocab_text = "\n".join(lines)
         st.download_button(
             label="Download Vocabulary List",
             data=vocab_text,
@@ -601,6 +661,7 @@ else:
                 st.session_state.learning_mode = mode_key
                 # Reset history pour appliquer le nouveau mode
                 st.session_state.history = []
+                st.session_state.context.reset()
                 st.rerun()
     
     st.markdown("</div>", unsafe_allow_html=True)
@@ -609,6 +670,20 @@ else:
     current_mode = LEARNING_MODES.get(st.session_state.learning_mode, LEARNING_MODES["general"])
     st.success(f"**Current mode:** {current_mode['icon']} {current_mode['name']}")
     
+    # Apprenant (chaque apprenant a son propre historique et ses statistiques)
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.subheader("👤 Learner")
+    learner_name = st.text_input(
+        "Learner name",
+        value=st.session_state.learner_id,
+        help="Your conversations and progress are saved under this name."
+    ).strip() or DEFAULT_LEARNER
+    if learner_name != st.session_state.learner_id:
+        st.session_state.learner_id = learner_name
+        st.session_state.manager = ConversationManager(learner_id=learner_name)
+        st.success(f"Now practicing as **{learner_name}**")
+    st.markdown("</div>", unsafe_allow_html=True)
+    
     # Paramètres de conversation
     st.markdown('<div class="card">', unsafe_allow_html=True)
     st.subheader("💬 Conversation Style")
@@ -684,6 +759,7 @@ else:
     with col1:
         if st.button("🔄 Reset Current Session", use_container_width=True):
             st.session_state.history = []
+            st.session_state.context.reset()
             st.session_state.turns = []
             st.session_state.last_audio_hash = None
             st.session_state.avatar_state = "idle"